@@ -67,16 +67,16 @@ def _load_tokens(path):
     
     return data
 
-def _resolve_tokens_file() -> str:
+def _resolve_tokens_file(profile_id=None) -> str:
     """Resolve the tokens file path from env/CLI profile with legacy fallback."""
     override = os.getenv("FITBIT_TOKENS_FILE", "").strip()
     if override:
         return os.path.abspath(override)
-    profile_id = get_active_profile(None)
+    profile_id = get_active_profile(profile_id)
     return tokens_file_for(profile_id)
 
 
-def _resolve_client_credentials() -> tuple[str, str]:
+def _resolve_client_credentials(profile_id=None) -> tuple[str, str]:
     """Resolve client ID/secret from env or profile file, with defaults as fallback."""
     def _find_repeating_segment(s: str, min_seg: int = 16) -> int | None:
         n = len(s)
@@ -104,7 +104,7 @@ def _resolve_client_credentials() -> tuple[str, str]:
     env_secret = os.getenv("FITBIT_CLIENT_SECRET", "")
     if env_id and env_secret:
         return _sanitize(env_id, "Client ID"), _sanitize(env_secret, "Client Secret")
-    profile_id = get_active_profile(None)
+    profile_id = get_active_profile(profile_id)
     cred_path = client_credentials_file_for(profile_id)
     try:
         if os.path.exists(cred_path):
@@ -129,15 +129,25 @@ def _resolve_client_credentials() -> tuple[str, str]:
     return CLIENT_ID, CLIENT_SECRET
 
 
-def refresh_token():
-    tokens_file = _resolve_tokens_file()
+def _wait_budget(deadline, wanted):
+    """Seconds to spend on the next wait or request, capped by the overall deadline (None = no cap)."""
+    if deadline is None:
+        return wanted
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("[fitbit] Token refresh timed out")
+    return min(wanted, remaining)
+
+
+def refresh_token(profile_id=None, deadline=None):
+    tokens_file = _resolve_tokens_file(profile_id)
     print(f"[fitbit] Using token file: {os.path.abspath(tokens_file)}")
     tokens = _load_tokens(tokens_file)
     rt = tokens.get("refresh_token")
     print(f"[fitbit] Refresh token: {_mask(rt)}")
 
     token_url = "https://api.fitbit.com/oauth2/token"
-    cid, csec = _resolve_client_credentials()
+    cid, csec = _resolve_client_credentials(profile_id)
     auth_header = base64.b64encode(f"{cid}:{csec}".encode()).decode()
     headers = {
         "Authorization": f"Basic {auth_header}",
@@ -153,20 +163,20 @@ def refresh_token():
         attempt += 1
         try:
             print(f"[fitbit] Requesting new access token (attempt {attempt}/{MAX_RETRIES})")
-            res = requests.post(token_url, headers=headers, data=data, timeout=TIMEOUT)
+            res = requests.post(token_url, headers=headers, data=data, timeout=_wait_budget(deadline, TIMEOUT))
         except requests.Timeout:
             if attempt >= MAX_RETRIES:
                 raise TimeoutError("[fitbit] Fitbit token endpoint timed out repeatedly")
             delay = BACKOFF_BASE ** attempt
             print(f"[fitbit] Timeout. Retrying in {delay:.1f}s")
-            time.sleep(delay)
+            time.sleep(_wait_budget(deadline, delay))
             continue
         except requests.RequestException as e:
             if attempt >= MAX_RETRIES:
                 raise RuntimeError(f"[fitbit] Network error refreshing token: {e}")
             delay = BACKOFF_BASE ** attempt
             print(f"[fitbit] Network error: {e}. Retrying in {delay:.1f}s")
-            time.sleep(delay)
+            time.sleep(_wait_budget(deadline, delay))
             continue
 
         if res.status_code == 200:
@@ -198,7 +208,7 @@ def refresh_token():
             except ValueError:
                 delay = int(BACKOFF_BASE ** attempt)
             print(f"[fitbit] Rate limited (429). Waiting {delay}s")
-            time.sleep(delay)
+            time.sleep(_wait_budget(deadline, delay))
             continue
 
         if res.status_code in (500, 502, 503, 504):
@@ -206,7 +216,7 @@ def refresh_token():
                 raise RuntimeError(f"[fitbit] Server error {res.status_code}: {res.text}")
             delay = int(BACKOFF_BASE ** attempt)
             print(f"[fitbit] Server error {res.status_code}. Retrying in {delay}s")
-            time.sleep(delay)
+            time.sleep(_wait_budget(deadline, delay))
             continue
 
         if res.status_code in (400, 401):
@@ -226,6 +236,21 @@ def refresh_token():
 
     raise RuntimeError("[fitbit] Exhausted retries without obtaining a token")
 
+
+def refresh(profile_id, timeout=TIMEOUT) -> tuple[bool, str]:
+    """Refresh a profile's tokens in-process; returns (ok, message) instead of raising.
+
+    - `timeout` bounds the whole refresh (requests, retries and backoff waits), in seconds
+    """
+    try:
+        access_token = refresh_token(profile_id, deadline=time.monotonic() + timeout)
+    except Exception as e:
+        msg = str(e).replace("[fitbit]", "").strip()
+        if isinstance(e, FileNotFoundError):
+            msg = "Token file not found"
+        return False, msg or "Token refresh failed"
+    return True, f"Successfully refreshed token: {_mask(access_token)}"
+
 if __name__ == "__main__":
     try:
         access_token = refresh_token()
@@ -0,0 +1,126 @@
+import glob
+import hashlib
+import os
+import re
+from typing import Iterable, Optional
+
+import pandas as pd
+
+# Fitbit measurements that comfortably fit float32; halves their memory and bandwidth
+FLOAT32_COLUMNS = (
+    "steps",
+    "resting_heart_rate",
+    "dailyRmssd",
+    "deepRmssd",
+    "efficiency",
+    "minutesAsleep",
+    "minutesAwake",
+    "minutesToFallAsleep",
+    "minutesDeep",
+    "minutesREM",
+    "minutesLight",
+    "minutesWakeStages",
+    "timeInBed",
+)
+
+
+_DEFAULT_PARSE_DATES = ("date",)
+
+# Suffix of a variant sidecar written by load_csv_cached: .<8 hex digits>.parquet
+_VARIANT_SUFFIX = re.compile(r"\.[0-9a-f]{8}\.parquet")
+
+
+def parquet_sidecar_for(csv_path: str, variant: Optional[str] = None) -> str:
+    """Path of the Parquet sidecar kept next to a CSV (same name, .parquet or .<variant>.parquet)."""
+    base = os.path.splitext(csv_path)[0]
+    return f"{base}.{variant}.parquet" if variant else base + ".parquet"
+
+
+def _load_variant(parse_dates: Iterable[str], float32_columns: Iterable[str]) -> Optional[str]:
+    """Sidecar variant tag for non-default load options (None for the defaults).
+
+    - Frames typed with different options must not share a sidecar
+    """
+    options = (tuple(parse_dates), tuple(float32_columns))
+    if options == (_DEFAULT_PARSE_DATES, tuple(FLOAT32_COLUMNS)):
+        return None
+    return hashlib.sha1(repr(options).encode("utf-8")).hexdigest()[:8]
+
+
+def _remove_stale_variants(csv_path: str, keep: str) -> None:
+    """Delete variant sidecars of `csv_path` other than `keep` (left behind when load options change)."""
+    base = os.path.splitext(csv_path)[0]
+    for other in glob.glob(glob.escape(base) + ".*.parquet"):
+        if other != keep and _VARIANT_SUFFIX.fullmatch(other[len(base):]):
+            try:
+                os.remove(other)
+            except OSError:
+                pass
+
+
+def load_csv_cached(
+    path: str,
+    parse_dates: Iterable[str] = _DEFAULT_PARSE_DATES,
+    float32_columns: Iterable[str] = FLOAT32_COLUMNS,
+) -> pd.DataFrame:
+    """Load a fetched CSV, reusing a typed Parquet sidecar when it is fresh.
+
+    - Sidecar is used when it is at least as new as the CSV
+    - Each combination of `parse_dates`/`float32_columns` gets its own sidecar; writing a
+      non-default one removes variant sidecars left by other options
+    - Otherwise the CSV is parsed (ISO dates in `parse_dates`) and the sidecar rewritten
+    - Numeric columns in `float32_columns` are coerced to float32 (bad cells become NaN)
+    - Without a Parquet engine (pyarrow/fastparquet) this is a plain CSV load
+    - Raises FileNotFoundError if the CSV itself does not exist
+    """
+    csv_mtime = os.stat(path).st_mtime_ns
+    parse_dates = tuple(parse_dates)
+    float32_columns = tuple(float32_columns)
+    variant = _load_variant(parse_dates, float32_columns)
+    sidecar = parquet_sidecar_for(path, variant)
+    try:
+        if os.stat(sidecar).st_mtime_ns >= csv_mtime:
+            return pd.read_parquet(sidecar)
+    except Exception:
+        pass
+
+    df = pd.read_csv(path)
+    for c in parse_dates:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], format="%Y-%m-%d", errors="coerce", cache=True)
+    for c in float32_columns:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float32")
+
+    _write_parquet(df, sidecar)
+    if variant:
+        _remove_stale_variants(path, sidecar)
+    return df
+
+
+def _write_parquet(df: pd.DataFrame, path: str, **kwargs) -> None:
+    """Best-effort Parquet write via a temp file swapped into place.
+
+    - Readers never see a partially written file
+    - Any failure (e.g. no Parquet engine installed) is ignored
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp, index=False, **kwargs)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def export_summary(df: pd.DataFrame, csv_path: str) -> None:
+    """Write a generated summary table as CSV plus a zstd-compressed Parquet copy.
+
+    - The CSV stays the compatibility artifact for spreadsheets and existing tooling
+    - The Parquet copy keeps column dtypes and is smaller and faster to reload
+    - The Parquet copy is skipped silently when no Parquet engine is available
+    """
+    df.to_csv(csv_path, index=False)
+    _write_parquet(df, parquet_sidecar_for(csv_path), compression="zstd")
@@ -0,0 +1,54 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def fit_trend(x, y) -> Tuple[float, float]:
+    """Least-squares (slope, intercept) of a single-feature linear trend.
+
+    - Closed form, equivalent to a one-feature LinearRegression fit
+    - Pairs where either value is NaN are ignored
+    - A constant x (e.g. a single month) gives a flat line through mean(y)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[mask], y[mask]
+    if x.size == 0:
+        return np.nan, np.nan
+    xm = x.mean()
+    ym = y.mean()
+    dx = x - xm
+    denom = np.dot(dx, dx)
+    slope = float(np.dot(dx, y - ym) / denom) if denom > 0 else 0.0
+    return slope, float(ym - slope * xm)
+
+
+def _average_ranks(a: np.ndarray) -> np.ndarray:
+    """1-based ranks of `a`, with ties sharing their average rank."""
+    sorter = np.argsort(a, kind="mergesort")
+    inv = np.empty_like(sorter)
+    inv[sorter] = np.arange(a.size)
+    a_sorted = a[sorter]
+    first = np.r_[True, a_sorted[1:] != a_sorted[:-1]]
+    dense = first.cumsum()[inv]
+    bounds = np.r_[np.nonzero(first)[0], a.size]
+    return 0.5 * (bounds[dense] + bounds[dense - 1] + 1)
+
+
+def correlations(x, y) -> Tuple[float, float]:
+    """Pearson and Spearman correlation of two equally long series.
+
+    - Pairs where either value is NaN are ignored
+    - Returns NaN for both when fewer than two pairs remain or a side is constant
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[mask], y[mask]
+    if x.size < 2:
+        return np.nan, np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pearson = float(np.corrcoef(x, y)[0, 1])
+        spearman = float(np.corrcoef(_average_ranks(x), _average_ranks(y))[0, 1])
+    return pearson, spearman
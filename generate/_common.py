@@ -0,0 +1,207 @@
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Ensure repo root on sys.path for common imports when invoked from this folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.profile_paths import resolve_or_prompt_profile, csv_path_for
+from common.csv_cache import export_summary, load_csv_cached
+from common.stats import fit_trend
+
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Single Figure reused by every chart in the process (see new_figure)
+_FIGURE = None
+
+
+# Describes one single-value daily metric (HRV, RHR) for the shared analyze() pipeline.
+@dataclass(frozen=True)
+class MetricConfig:
+    file: str  # CSV name under the profile's csv/ folder
+    raw_col: str  # column written by the fetcher
+    value_col: str  # column name used in summaries and exports
+    trend_col: str  # exported trend column
+    label: str  # short label in printed summaries and legends, e.g. "RMSSD"
+    summary_title: str  # "Monthly average <summary_title>:" header
+    plot_title: str  # "Monthly Average <plot_title> with Trend"
+    ylabel: str  # y-axis label and yearly chart subject
+    bar_color: str  # yearly bar colour
+    export_name: str  # average_<export_name>_per_month.csv / _per_year.csv
+    data_name: str  # used in load error messages
+    fetch_script: str  # fetch script suggested when the CSV is missing
+    weekday_heatmap: bool = False
+
+
+# Headless pyplot: select the non-interactive Agg backend before pyplot is first imported.
+def pyplot():
+    if "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+# Clear and resize the shared Figure (creating it on first use) and make it current for plt.* calls.
+def new_figure(figsize):
+    global _FIGURE
+    plt = pyplot()
+    if _FIGURE is None:
+        _FIGURE = plt.figure(figsize=figsize)
+    else:
+        _FIGURE.clear()
+        _FIGURE.set_size_inches(figsize)
+        plt.figure(_FIGURE.number)
+    return _FIGURE
+
+
+# Write the current chart as <name>.png into out_dir.
+def save_figure(out_dir, name):
+    _FIGURE.savefig(os.path.join(out_dir, f"{name}.png"), dpi=100)
+
+
+# Build monthly and yearly aggregates and a time index for trend modeling.
+def monthly_yearly_aggregates(df, cols):
+    # One pass over the dates: months since 1970-01 as a single integer group key
+    dates = df["date"].to_numpy(dtype="datetime64[ns]")
+    valid = ~np.isnat(dates)
+    month_bin = dates[valid].astype("datetime64[M]").astype(np.int64)
+    values = df.loc[valid, cols]
+    monthly = values.groupby(month_bin)[cols].mean(numeric_only=True)
+    # Decode year/month only for the handful of resulting bins
+    bins = monthly.index.to_numpy()
+    monthly.insert(0, "year", (bins // 12 + 1970).astype(np.int32))
+    monthly.insert(1, "month", (bins % 12 + 1).astype(np.int32))
+    monthly = monthly.reset_index(drop=True)
+    year = pd.Index((month_bin // 12 + 1970).astype(np.int32), name="year")
+    yearly = values.groupby(year)[cols].mean(numeric_only=True).reset_index()
+    monthly["month_year"] = monthly.apply(lambda x: f"{int(x['month']):02d}/{str(int(x['year']))[2:]}", axis=1)
+    monthly["time_index"] = np.arange(len(monthly))
+    return monthly, yearly
+
+
+# Fit a linear trend on a monthly series using its time index.
+def add_trend(df, target_col, trend_col=None):
+    trend_col = trend_col or target_col + "_trend"
+    if target_col not in df.columns or df[target_col].dropna().empty:
+        df[trend_col] = np.nan
+        return df
+    slope, intercept = fit_trend(df["time_index"], df[target_col])
+    df[trend_col] = slope * df["time_index"] + intercept
+    return df
+
+
+# Print monthly values grouped into blocks, each closed by that year's average.
+def print_monthly_by_year(monthly, yearly, value_col, label):
+    year_avg = yearly.set_index("year")[value_col]
+    month_lines = monthly["month_year"] + ": " + monthly[value_col].map("{:.2f}".format)
+    year_blocks = [
+        "\n".join(lines) + f"\n\nYear {year} average {label}: {year_avg[year]:.2f}\n" + "-" * 40
+        for year, lines in month_lines.groupby(monthly["year"])
+    ]
+    if year_blocks:
+        print("\n".join(year_blocks))
+
+
+# Plot the monthly average of a metric with its linear trend line.
+def plot_monthly_with_trend(monthly, cfg, out_dir):
+    plt = pyplot()
+
+    new_figure((14, 7))
+    plt.plot(monthly["month_year"], monthly[cfg.value_col], marker="o", label=f"Average {cfg.label}")
+    plt.plot(monthly["month_year"], monthly[cfg.trend_col], color="red", label="Trend Line")
+    plt.title(f"Monthly Average {cfg.plot_title} with Trend")
+    plt.xlabel("Month/Year")
+    plt.ylabel(cfg.ylabel)
+    plt.xticks(rotation=45)
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    save_figure(out_dir, f"{cfg.export_name}_monthly_trend")
+
+
+# Plot bar chart of yearly averages with value labels.
+def plot_yearly_bars(yearly, cfg, out_dir):
+    plt = pyplot()
+
+    new_figure((10, 5))
+    bars = plt.bar(yearly["year"], yearly[cfg.value_col], color=cfg.bar_color)
+    for bar in bars:
+        plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), f"{bar.get_height():.2f}", ha="center", va="bottom")
+    plt.title(f"Yearly Average {cfg.ylabel}")
+    plt.xlabel("Year")
+    plt.ylabel(cfg.ylabel)
+    plt.grid(axis="y")
+    plt.tight_layout()
+    save_figure(out_dir, f"{cfg.export_name}_yearly")
+
+
+# Heatmap of the metric's average by day of the week.
+def plot_weekday_heatmap(df, cfg, out_dir):
+    import seaborn as sns
+
+    plt = pyplot()
+
+    # Rows with a missing (NaT) date or value are skipped; a NaT turns dayofweek into float
+    day_num = df["date"].dt.dayofweek.to_numpy()
+    values = df[cfg.value_col].to_numpy(dtype=float)
+    valid = df["date"].notna().to_numpy() & ~np.isnan(values)
+    day_num = day_num[valid].astype(np.intp)
+
+    # Calculate weekly averages by day of week (Monday=0) with fixed 7-bin counts
+    day_sums = np.bincount(day_num, weights=values[valid], minlength=7)
+    day_counts = np.bincount(day_num, minlength=7)
+    with np.errstate(invalid="ignore"):
+        weekly_avg = day_sums / day_counts
+
+    # The heatmap source is just this 7x1 column, already in Monday..Sunday order
+    day_avg_matrix = pd.DataFrame({cfg.value_col: weekly_avg}, index=pd.Index(DAY_ORDER, name="day_of_week"))
+
+    new_figure((10, 5))
+    sns.heatmap(day_avg_matrix, annot=True, cmap="coolwarm_r", fmt=".2f")
+    plt.title(f"Heatmap of Average {cfg.plot_title} by Day of the Week")
+    plt.xlabel("Day of the Week")
+    plt.ylabel(f"Average {cfg.plot_title}")
+    save_figure(out_dir, f"{cfg.export_name}_weekday_heatmap")
+
+
+# Load, summarize, plot, and export monthly/yearly averages for one metric.
+def analyze(cfg, profile_id=None):
+    csv_path = None
+    try:
+        profile_id = resolve_or_prompt_profile(profile_id)
+        csv_path = csv_path_for(profile_id, cfg.file)
+        df = load_csv_cached(csv_path)
+    except FileNotFoundError:
+        print(f"❌ Error: {csv_path} not found.")
+        print(f"   Please run {cfg.fetch_script} first to generate the {cfg.data_name} data.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error loading {cfg.data_name} data: {e}")
+        sys.exit(1)
+
+    df[cfg.value_col] = df[cfg.raw_col]
+    monthly, yearly = monthly_yearly_aggregates(df, [cfg.value_col])
+
+    # Linear regression to find trend
+    slope, intercept = fit_trend(monthly["time_index"], monthly[cfg.value_col])
+    monthly[cfg.trend_col] = slope * monthly["time_index"] + intercept
+
+    print(f"Monthly average {cfg.summary_title}:")
+    print_monthly_by_year(monthly, yearly, cfg.value_col, cfg.label)
+    print(f"\nLinear Regression Model: {cfg.label} = {slope:.4f} * time_index + {intercept:.4f}")
+
+    # Charts (PNG) and summaries are saved next to the input CSV
+    out_dir = os.path.dirname(csv_path)
+    plot_monthly_with_trend(monthly, cfg, out_dir)
+    plot_yearly_bars(yearly, cfg, out_dir)
+    if cfg.weekday_heatmap:
+        # HRV readings are taken during sleep, so they represent recovery felt on that day
+        plot_weekday_heatmap(df, cfg, out_dir)
+
+    export_summary(monthly, os.path.join(out_dir, f"average_{cfg.export_name}_per_month.csv"))
+    export_summary(yearly, os.path.join(out_dir, f"average_{cfg.export_name}_per_year.csv"))
+    return monthly, yearly
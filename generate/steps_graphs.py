@@ -2,58 +2,30 @@ import os
 import sys
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-from datetime import timedelta
 
 # Ensure repo root on sys.path for common imports when invoked from this folder
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common.profile_paths import resolve_or_prompt_profile, csv_path_for
+from common.csv_cache import export_summary, load_csv_cached
+from _common import add_trend, monthly_yearly_aggregates, new_figure, pyplot, save_figure
 
 STEPS_FILE = "fitbit_activity.csv"
 
 
 # Load and normalize the raw steps CSV into a clean dataframe with parsed dates.
 def load_steps_df(path):
-    df = pd.read_csv(path)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
+    df = load_csv_cached(path)
     df["steps"] = pd.to_numeric(df["steps"], errors="coerce")
-    return df.dropna(subset=["date", "steps"]).copy()
-
-
-# Build monthly and yearly aggregates and a time index for trend modeling.
-def monthly_yearly_aggregates(df):
-    t = df.copy()
-    t["timestamp"] = pd.to_datetime(t["date"])
-    t["year"] = t["timestamp"].dt.year
-    t["month"] = t["timestamp"].dt.month
-    cols = ["steps"]
-    monthly = t.groupby(["year", "month"], as_index=False)[cols].mean(numeric_only=True)
-    yearly = t.groupby(["year"], as_index=False)[cols].mean(numeric_only=True)
-    monthly["month_year"] = monthly.apply(lambda x: f"{int(x['month']):02d}/{str(int(x['year']))[2:]}", axis=1)
-    monthly = monthly.sort_values(["year", "month"]).reset_index(drop=True)
-    monthly["time_index"] = np.arange(len(monthly))
-    return monthly, yearly
-
-
-# Fit a linear trend on a monthly series using its time index.
-def add_trend(df, target_col):
-    z = df.copy()
-    if target_col not in z.columns or z[target_col].dropna().empty:
-        z[target_col + "_trend"] = np.nan
-        return z
-    m = z[["time_index", target_col]].dropna()
-    model = LinearRegression()
-    model.fit(m[["time_index"]], m[target_col])
-    z[target_col + "_trend"] = model.predict(z[["time_index"]])
-    return z
+    return df.dropna(subset=["date", "steps"])
 
 
 # Plot daily steps as a line graph over time.
-def plot_daily_steps(df):
+def plot_daily_steps(df, out_dir):
+    plt = pyplot()
+
     if "steps" not in df.columns or df.empty:
         return
-    plt.figure(figsize=(16, 8))
+    new_figure((16, 8))
     plt.plot(df["date"], df["steps"], linewidth=1, alpha=0.7, color="#4CAF50")
     plt.title("Daily Steps Over Time", fontsize=16, fontweight="bold")
     plt.xlabel("Date", fontsize=12)
@@ -61,14 +33,16 @@ def plot_daily_steps(df):
     plt.xticks(rotation=45)
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    save_figure(out_dir, "steps_daily")
 
 
 # Plot monthly average steps with optional linear trend overlay.
-def plot_monthly_steps(monthly):
+def plot_monthly_steps(monthly, out_dir):
+    plt = pyplot()
+
     if "steps" not in monthly.columns:
         return
-    plt.figure(figsize=(14, 7))
+    new_figure((14, 7))
     plt.plot(monthly["month_year"], monthly["steps"], marker="o", label="Avg Steps", linewidth=2, markersize=6)
     if "steps_trend" in monthly.columns:
         plt.plot(monthly["month_year"], monthly["steps_trend"], label="Trend", linewidth=2, linestyle="--", alpha=0.8)
@@ -79,14 +53,16 @@ def plot_monthly_steps(monthly):
     plt.grid(True, alpha=0.3)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    save_figure(out_dir, "steps_monthly")
 
 
 # Plot bar chart of yearly average steps with labels.
-def plot_yearly_steps(yearly):
+def plot_yearly_steps(yearly, out_dir):
+    plt = pyplot()
+
     if "steps" not in yearly.columns:
         return
-    plt.figure(figsize=(10, 6))
+    new_figure((10, 6))
     bars = plt.bar(yearly["year"], yearly["steps"], color="#4CAF50", alpha=0.7)
     for b in bars:
         plt.text(b.get_x() + b.get_width()/2, b.get_height(), f"{b.get_height():.0f}", ha="center", va="bottom")
@@ -95,33 +71,47 @@ def plot_yearly_steps(yearly):
     plt.ylabel("Steps", fontsize=12)
     plt.grid(axis="y", alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    save_figure(out_dir, "steps_yearly")
 
 
 # Plot a histogram of daily steps.
-def plot_steps_hist(df):
+def plot_steps_hist(df, out_dir):
+    plt = pyplot()
+
     if "steps" not in df.columns:
         return
-    plt.figure(figsize=(10, 6))
+    new_figure((10, 6))
     plt.hist(df["steps"].dropna(), bins=30, color="#4CAF50", alpha=0.7, edgecolor="black")
     plt.title("Distribution of Daily Steps", fontsize=16, fontweight="bold")
     plt.xlabel("Steps", fontsize=12)
     plt.ylabel("Count", fontsize=12)
     plt.grid(axis="y", alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    save_figure(out_dir, "steps_hist")
+
+
+# Centered rolling mean matching Series.rolling(window, center=True).mean() on NaN-free data.
+def centered_rolling_mean(values, window=7):
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        half = window // 2
+        out[half:half + len(values) - window + 1] = np.convolve(values, np.full(window, 1.0 / window), mode="valid")
+    return out
 
 
 # Plot steps with 7-day rolling average overlay.
-def plot_steps_with_rolling_average(df):
+def plot_steps_with_rolling_average(df, out_dir):
+    plt = pyplot()
+
     if "steps" not in df.columns or df.empty:
         return
-    df_sorted = df.sort_values("date").copy()
-    df_sorted["rolling_avg"] = df_sorted["steps"].rolling(window=7, center=True).mean()
+    df_sorted = df.sort_values("date")
+    rolling_avg = centered_rolling_mean(df_sorted["steps"], window=7)
     
-    plt.figure(figsize=(16, 8))
+    new_figure((16, 8))
     plt.plot(df_sorted["date"], df_sorted["steps"], linewidth=1, alpha=0.6, color="#4CAF50", label="Daily Steps")
-    plt.plot(df_sorted["date"], df_sorted["rolling_avg"], linewidth=3, color="#2E7D32", label="7-Day Rolling Average")
+    plt.plot(df_sorted["date"], rolling_avg, linewidth=3, color="#2E7D32", label="7-Day Rolling Average")
     plt.title("Daily Steps with 7-Day Rolling Average", fontsize=16, fontweight="bold")
     plt.xlabel("Date", fontsize=12)
     plt.ylabel("Steps", fontsize=12)
@@ -129,22 +119,23 @@ def plot_steps_with_rolling_average(df):
     plt.grid(True, alpha=0.3)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    save_figure(out_dir, "steps_rolling_average")
 
 
 # Plot steps by day of week.
-def plot_steps_by_weekday(df):
+def plot_steps_by_weekday(df, out_dir):
+    plt = pyplot()
+
     if "steps" not in df.columns or df.empty:
         return
-    df_copy = df.copy()
-    df_copy["timestamp"] = pd.to_datetime(df_copy["date"])
-    df_copy["weekday"] = df_copy["timestamp"].dt.day_name()
-    
     weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    weekday_avg = df_copy.groupby("weekday")["steps"].mean().reindex(weekday_order)
+    weekday = df["date"].dt.dayofweek.to_numpy()
+    steps = df["steps"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        weekday_avg = np.bincount(weekday, weights=steps, minlength=7) / np.bincount(weekday, minlength=7)
     
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(weekday_avg.index, weekday_avg.values, color="#4CAF50", alpha=0.7)
+    new_figure((10, 6))
+    bars = plt.bar(weekday_order, weekday_avg, color="#4CAF50", alpha=0.7)
     for b in bars:
         plt.text(b.get_x() + b.get_width()/2, b.get_height(), f"{b.get_height():.0f}", ha="center", va="bottom")
     plt.title("Average Steps by Day of Week", fontsize=16, fontweight="bold")
@@ -153,7 +144,7 @@ def plot_steps_by_weekday(df):
     plt.xticks(rotation=45)
     plt.grid(axis="y", alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    save_figure(out_dir, "steps_by_weekday")
 
 
 # Orchestrate data loading, aggregation, plotting, and CSV outputs.
@@ -166,31 +157,29 @@ def main():
         return
     
     df = load_steps_df(steps_csv)
-    monthly, yearly = monthly_yearly_aggregates(df)
+    monthly, yearly = monthly_yearly_aggregates(df, ["steps"])
     monthly = add_trend(monthly, "steps")
     
-    print("Monthly averages:")
-    for _, r in monthly.iterrows():
-        val = r["steps"] if "steps" in monthly.columns else np.nan
-        print(f"{r['month_year']}: Steps={val:.0f}" if pd.notna(val) else f"{r['month_year']}: Steps=NA")
+    vals = monthly["steps"] if "steps" in monthly.columns else pd.Series(np.nan, index=monthly.index)
+    month_lines = monthly["month_year"] + ": Steps=" + vals.map("{:.0f}".format).where(vals.notna(), "NA")
+    print("\n".join(["Monthly averages:", *month_lines]))
     
     if "steps" in yearly.columns:
-        print("\nYearly averages:")
-        for _, r in yearly.iterrows():
-            print(f"Year {int(r['year'])}: Steps={r['steps']:.0f}")
+        year_lines = "Year " + yearly["year"].astype(int).astype(str) + ": Steps=" + yearly["steps"].map("{:.0f}".format)
+        print("\n".join(["\nYearly averages:", *year_lines]))
     
-    # Generate all plots
-    plot_daily_steps(df)
-    plot_monthly_steps(monthly)
-    plot_yearly_steps(yearly)
-    plot_steps_hist(df)
-    plot_steps_with_rolling_average(df)
-    plot_steps_by_weekday(df)
+    # Generate all plots (saved as PNGs next to the CSV)
+    out_dir = os.path.dirname(steps_csv)
+    plot_daily_steps(df, out_dir)
+    plot_monthly_steps(monthly, out_dir)
+    plot_yearly_steps(yearly, out_dir)
+    plot_steps_hist(df, out_dir)
+    plot_steps_with_rolling_average(df, out_dir)
+    plot_steps_by_weekday(df, out_dir)
     
     # Save aggregated data to CSV
-    out_dir = os.path.dirname(steps_csv)
-    monthly.to_csv(os.path.join(out_dir, "average_steps_per_month.csv"), index=False)
-    yearly.to_csv(os.path.join(out_dir, "average_steps_per_year.csv"), index=False)
+    export_summary(monthly, os.path.join(out_dir, "average_steps_per_month.csv"))
+    export_summary(yearly, os.path.join(out_dir, "average_steps_per_year.csv"))
     
     print(f"\n✅ Steps analysis complete!")
     print(f"   Monthly data saved to: {os.path.join(out_dir, 'average_steps_per_month.csv')}")
@@ -7,9 +7,19 @@ bind = "0.0.0.0:9000"
 backlog = 2048
 
 # Worker processes
+# Kept deliberately small: fetch/auth job state lives in each worker's memory, so
+# concurrency comes from threads within a worker rather than from more processes.
 workers = min(2, multiprocessing.cpu_count() * 2 + 1)
-worker_class = "sync"
+# Threaded workers keep status polling responsive while a request is busy on I/O
+# (CSV/PNG files, Fitbit API calls, subprocess output); sync workers block per request.
+# Set GUNICORN_WORKER_CLASS=gevent (with gevent installed) to serve many concurrent
+# status polls from greenlets; gunicorn monkey-patches the worker itself.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = 4
+# Greenlets per worker (gevent/eventlet only)
 worker_connections = 1000
+# Heartbeat files on tmpfs avoid worker stalls on slow or overlay-backed /tmp
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
 timeout = 300
 keepalive = 2
 
@@ -17,8 +27,9 @@ keepalive = 2
 max_requests = 1000
 max_requests_jitter = 100
 
-# Preload app for better performance
-preload_app = True
+# Preload app for better performance. Not with gevent: the app would be imported in the
+# master before the worker monkey-patches threading, leaving unpatched locks behind.
+preload_app = worker_class not in ("gevent", "eventlet")
 
 # Logging
 accesslog = "-"
@@ -18,131 +18,271 @@ The script preserves all application code and configuration files.
 import os
 import sys
 import shutil
-import glob
-import argparse
-from pathlib import Path
+import stat
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+# Project root; all data paths below are relative to it, whatever the current directory is
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Native recursive delete command for whole trees, or None to delete from Python
+if os.name == "nt":
+    _FAST_RM = ["cmd", "/c", "rmdir", "/S", "/Q"]
+elif shutil.which("rm"):
+    _FAST_RM = [shutil.which("rm"), "-rf", "--"]
+else:
+    _FAST_RM = None
+
+# Console-safe stand-ins for the status emoji (U+FE0F is the emoji variation selector after ⚠)
+_ASCII_FALLBACK = str.maketrans({
+    "⚠": "[WARNING]",
+    "\ufe0f": None,
+    "❌": "[ERROR]",
+    "✅": "[SUCCESS]",
+    "⏹": "[STOP]",
+})
+
+# Lines collected by batched_status(); None when print_status writes directly
+_STATUS_BUF = None
 
 
 def print_status(message, status="INFO"):
     """Print a status message with safe Unicode handling."""
+    if _STATUS_BUF is not None:
+        _STATUS_BUF.append(message)
+        return
     try:
         print(message)
     except UnicodeEncodeError:
         # Fallback to ASCII-safe characters for Windows console
-        safe_message = message.replace('⚠️', '[WARNING]').replace('❌', '[ERROR]').replace('✅', '[SUCCESS]')
-        print(safe_message)
+        print(message.translate(_ASCII_FALLBACK))
+
+
+@contextmanager
+def batched_status():
+    """Collect print_status lines and write them as one block on exit."""
+    global _STATUS_BUF
+    _STATUS_BUF = []
+    try:
+        yield
+    finally:
+        lines, _STATUS_BUF = _STATUS_BUF, None
+        if lines:
+            print_status("\n".join(lines))
+
+
+def remove_tree(path):
+    """Remove a directory tree, preferring the platform's native recursive delete.
+
+    Tries `rm -rf` (or `rmdir /S /Q` on Windows) first; if that is unavailable or
+    fails, finishes in Python with _remove_tree_fd, or shutil.rmtree where
+    directory fds are unsupported.
+    """
+    if _FAST_RM:
+        try:
+            subprocess.run(_FAST_RM + [path], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if not os.path.lexists(path):
+                return
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    if not (os.scandir in os.supports_fd and os.unlink in os.supports_dir_fd and os.rmdir in os.supports_dir_fd):
+        shutil.rmtree(path)
+        return
+    _remove_tree_fd(path)
+
+
+def _remove_tree_fd(path, max_depth=16):
+    """Depth-first delete over an explicit stack of open directory fds.
 
+    - Each level is listed once; files are unlinked relative to its fd
+    - Symlinks are unlinked, never followed (O_NOFOLLOW on every open)
+    - Subtrees nested deeper than max_depth are handed to shutil.rmtree
+    """
+    flags = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW
+    # Frames of (dir fd, name in parent, path, subdirectory names still to remove)
+    stack = []
 
-def safe_remove_path(path, description):
-    """Safely remove a file or directory if it exists."""
-    if os.path.exists(path):
+    def enter(fd, name, dir_path):
         try:
-            if os.path.isdir(path):
-                shutil.rmtree(path)
-                print_status(f"Removed directory: {path}", "SUCCESS")
+            subdirs = []
+            with os.scandir(fd) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        os.unlink(entry.name, dir_fd=fd)
+        except BaseException:
+            os.close(fd)
+            raise
+        stack.append((fd, name, dir_path, subdirs))
+
+    try:
+        enter(os.open(path, flags), None, path)
+        while stack:
+            fd, name, dir_path, subdirs = stack[-1]
+            if not subdirs:
+                stack.pop()
+                os.close(fd)
+                if stack:
+                    os.rmdir(name, dir_fd=stack[-1][0])
+                continue
+            child = subdirs.pop()
+            if len(stack) >= max_depth:
+                shutil.rmtree(os.path.join(dir_path, child))
             else:
-                os.remove(path)
-                print_status(f"Removed file: {path}", "SUCCESS")
-            return True
-        except Exception as e:
-            print_status(f"Failed to remove {description}: {e}", "ERROR")
-            return False
-    else:
-        print_status(f"{description} not found (already clean)", "INFO")
-        return True
+                enter(os.open(child, flags, dir_fd=fd), child, os.path.join(dir_path, child))
+    finally:
+        for fd, _, _, _ in reversed(stack):
+            os.close(fd)
+    os.rmdir(path)
 
 
-def show_usage():
-    """Display usage information and examples."""
-    print_status("DESCRIPTION:", "INFO")
-    print_status("  This script safely deletes user data, profiles, and generated files", "INFO")
-    print_status("  to return the FitBaus application to a clean state.", "INFO")
-    print()
-    print_status("USAGE:", "INFO")
-    print_status("  python reset.py                    # Delete ALL profiles and data", "INFO")
-    print_status("  python reset.py --profile <name>   # Delete specific profile only", "INFO")
-    print()
-    print_status("EXAMPLES:", "INFO")
-    print_status("  python reset.py --profile john     # Delete only the 'john' profile", "INFO")
-    print_status("  python reset.py --profile jane     # Delete only the 'jane' profile", "INFO")
-    print_status("  python reset.py                    # Delete everything (full reset)", "INFO")
-    print()
-    print_status("WHAT GETS DELETED (FULL RESET):", "WARNING")
-    print_status("  • profiles/ directory (all user profiles and data)", "WARNING")
-    print_status("  • auth/tokens.json (legacy authentication tokens)", "WARNING")
-    print_status("  • auth/client.json (legacy client credentials)", "WARNING")
-    print_status("  • csv/ directory (legacy CSV data files)", "WARNING")
-    print_status("  • Any token backup files (*.bak)", "WARNING")
-    print()
-    print_status("WHAT GETS DELETED (PROFILE-SPECIFIC):", "WARNING")
-    print_status("  • profiles/<name>/ directory (specific profile and data)", "WARNING")
-    print_status("  • profiles/<name>/auth/ (authentication tokens and credentials)", "WARNING")
-    print_status("  • profiles/<name>/csv/ (CSV data files for that profile)", "WARNING")
-    print_status("  • Any token backup files for that profile", "WARNING")
-    print()
-    print_status("WHAT GETS PRESERVED:", "SUCCESS")
-    print_status("  • All application code (auth/, common/, fetch/, generate/)", "SUCCESS")
-    print_status("  • Configuration files (requirements.txt, Dockerfile, etc.)", "SUCCESS")
-    print_status("  • Web interface files (index.html, script.js, style.css)", "SUCCESS")
-    print_status("  • Documentation and assets", "SUCCESS")
-    print_status("  • Other profiles (when using --profile)", "SUCCESS")
-    print()
-    print_status("=" * 60, "INFO")
+def remove_tree_parallel(path, max_workers=8):
+    """Remove a directory tree, deleting its top-level subdirectories concurrently.
+
+    Each subdirectory (e.g. one profile) goes to remove_tree on its own worker
+    thread; unlink/rmdir and the rm subprocess release the GIL, so they overlap.
+    The now-shallow root is then removed as usual.
+    """
+    with os.scandir(path) as it:
+        subdirs = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+    if len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(subdirs))) as pool:
+            # Consume the results so the first worker error is re-raised here
+            list(pool.map(remove_tree, subdirs))
+    remove_tree(path)
+
+
+def remove_path(path, description, parallel=False, base_dir=BASE_DIR):
+    """Remove a file or directory if it exists, without printing.
+
+    Returns (ok, message, status) for the caller to report, so removals can
+    run on worker threads and still be reported in a fixed order.
+    `path` is relative to `base_dir` and is shown as such in the message.
+    With parallel=True a directory's top-level subdirectories are removed concurrently.
+    """
+    full_path = os.path.join(base_dir, path)
+    try:
+        # Try the unlink first: files and symlinks go in one syscall, with no existence probe
+        try:
+            os.unlink(full_path)
+        except FileNotFoundError:
+            return True, f"{description} not found (already clean)", "INFO"
+        except (IsADirectoryError, PermissionError):
+            # unlink refuses directories (EISDIR on Linux, EPERM on macOS/Windows)
+            if not stat.S_ISDIR(os.lstat(full_path).st_mode):
+                raise
+            (remove_tree_parallel if parallel else remove_tree)(full_path)
+            return True, f"Removed directory: {path}", "SUCCESS"
+        return True, f"Removed file: {path}", "SUCCESS"
+    except Exception as e:
+        return False, f"Failed to remove {description}: {e}", "ERROR"
+
+
+def safe_remove_path(path, description, parallel=False, base_dir=BASE_DIR):
+    """Safely remove a file or directory if it exists, printing the outcome."""
+    ok, message, status = remove_path(path, description, parallel=parallel, base_dir=base_dir)
+    print_status(message, status)
+    return ok
+
+
+def iter_token_backups(base_dir=BASE_DIR, include_profiles=True):
+    """Yield existing token backups (relative to base_dir): the legacy auth/ one, then one per profile.
+
+    Profiles are listed with a single os.scandir pass (hidden entries skipped,
+    like a `profiles/*` glob) instead of globbing and re-checking each match.
+    Pass include_profiles=False once profiles/ is known to be gone.
+    """
+    legacy = os.path.join("auth", "tokens.json.bak")
+    if os.path.lexists(os.path.join(base_dir, legacy)):
+        yield legacy
+    if not include_profiles:
+        return
+    try:
+        entries = os.scandir(os.path.join(base_dir, "profiles"))
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            backup = os.path.join("profiles", entry.name, "auth", "tokens.json.bak")
+            if os.path.lexists(os.path.join(base_dir, backup)):
+                yield backup
+
+
+# Accepted answers at the confirmation prompt
+_YES = frozenset({"yes", "y"})
+_NO = frozenset({"no", "n"})
+
+# Warning blocks shown before the confirmation prompt, each written in a single call
+_CONFIRM_PROFILE_TEXT = """\
+⚠️  WARNING: This will permanently delete profile '{name}' and all its data!
+
+This includes:
+  • Profile '{name}' directory and all contents
+  • Authentication tokens for '{name}'
+  • Client credentials for '{name}'
+  • All CSV data files for '{name}'
+  • Any backup files for '{name}'
+
+Other profiles will be preserved.
+
+This action CANNOT be undone!
+"""
+
+_CONFIRM_ALL_TEXT = """\
+⚠️  WARNING: This will permanently delete ALL user data!
+
+This includes:
+  • All user profiles and authentication tokens
+  • All CSV data files (HRV, RHR, sleep, steps)
+  • All user-specific configuration files
+
+This action CANNOT be undone!
+"""
 
 
 def get_user_confirmation(is_profile_specific=False, profile_name=None):
     """Get user confirmation before proceeding with the reset."""
     if is_profile_specific:
-        print_status(f"⚠️  WARNING: This will permanently delete profile '{profile_name}' and all its data!", "WARNING")
-        print()
-        print_status("This includes:", "WARNING")
-        print_status(f"  • Profile '{profile_name}' directory and all contents", "WARNING")
-        print_status(f"  • Authentication tokens for '{profile_name}'", "WARNING")
-        print_status(f"  • Client credentials for '{profile_name}'", "WARNING")
-        print_status(f"  • All CSV data files for '{profile_name}'", "WARNING")
-        print_status(f"  • Any backup files for '{profile_name}'", "WARNING")
-        print()
-        print_status("Other profiles will be preserved.", "SUCCESS")
+        warning = _CONFIRM_PROFILE_TEXT.format(name=profile_name)
     else:
-        print_status("⚠️  WARNING: This will permanently delete ALL user data!", "WARNING")
-        print()
-        print_status("This includes:", "WARNING")
-        print_status("  • All user profiles and authentication tokens", "WARNING")
-        print_status("  • All CSV data files (HRV, RHR, sleep, steps)", "WARNING")
-        print_status("  • All user-specific configuration files", "WARNING")
-    
-    print()
-    print_status("This action CANNOT be undone!", "ERROR")
-    print()
+        warning = _CONFIRM_ALL_TEXT
+    print_status(warning, "WARNING")
     
     while True:
         response = input("Are you sure you want to proceed? Type 'yes' to continue or 'no' to cancel: ").strip().lower()
-        if response in ['yes', 'y']:
+        if response in _YES:
             return True
-        elif response in ['no', 'n']:
+        elif response in _NO:
             return False
         else:
             print_status("Please type 'yes' or 'no'", "WARNING")
 
 
-def delete_specific_profile(profile_name, skip_confirmation=False):
+def delete_specific_profile(profile_name, skip_confirmation=False, base_dir=BASE_DIR):
     """Delete a specific profile and all its data."""
     profile_path = f"profiles/{profile_name}"
     
-    if not os.path.exists(profile_path):
+    if not os.path.exists(os.path.join(base_dir, profile_path)):
         print_status(f"❌ Profile '{profile_name}' not found.", "ERROR")
         print_status(f"Available profiles:", "INFO")
         
-        # List available profiles
-        if os.path.exists("profiles"):
-            profiles = [d for d in os.listdir("profiles") if os.path.isdir(f"profiles/{d}") and d != "index.json"]
+        # List available profiles (one directory read; entry types come from the listing)
+        try:
+            with os.scandir(os.path.join(base_dir, "profiles")) as it:
+                profiles = [e.name for e in it if e.is_dir(follow_symlinks=False) and e.name != "index.json"]
+        except FileNotFoundError:
+            print_status("  No profiles directory found", "INFO")
+        else:
             if profiles:
                 for profile in profiles:
                     print_status(f"  • {profile}", "INFO")
             else:
                 print_status("  No profiles found", "INFO")
-        else:
-            print_status("  No profiles directory found", "INFO")
         
         return False
     
@@ -165,36 +305,11 @@ def delete_specific_profile(profile_name, skip_confirmation=False):
     # Track overall success
     all_success = True
     
-    # 1. Remove the specific profile directory
-    print_status(f"1. Removing profile '{profile_name}' directory...", "INFO")
-    if not safe_remove_path(profile_path, f"profile '{profile_name}' directory"):
+    # Remove the profile directory; its token backups (auth/tokens.json.bak) live inside it
+    print_status(f"Removing profile '{profile_name}' directory...", "INFO")
+    if not safe_remove_path(profile_path, f"profile '{profile_name}' directory", base_dir=base_dir):
         all_success = False
     
-    # 2. Remove profile-specific backup files
-    print_status(f"2. Removing backup files for profile '{profile_name}'...", "INFO")
-    backup_patterns = [
-        f"profiles/{profile_name}/auth/tokens.json.bak"
-    ]
-    
-    backup_files_found = 0
-    for pattern in backup_patterns:
-        for backup_file in glob.glob(pattern):
-            if os.path.exists(backup_file):
-                backup_files_found += 1
-                if not safe_remove_path(backup_file, f"backup file {backup_file}"):
-                    all_success = False
-    
-    if backup_files_found == 0:
-        print_status("No backup files found for this profile", "INFO")
-    
-    # 3. Verify profile deletion
-    print_status(f"3. Verifying profile '{profile_name}' deletion...", "INFO")
-    if os.path.exists(profile_path):
-        print_status(f"Warning: Profile '{profile_name}' directory still exists", "WARNING")
-        all_success = False
-    else:
-        print_status(f"Profile '{profile_name}' successfully deleted", "SUCCESS")
-    
     # Summary
     print_status("\n" + "=" * 60, "INFO")
     if all_success:
@@ -210,33 +325,88 @@ def delete_specific_profile(profile_name, skip_confirmation=False):
     return True
 
 
-def main():
-    """Main reset function."""
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description="Reset FitBaus application data")
+def delete_profile(profile_name, base_dir=BASE_DIR):
+    """Delete one profile without prompting or printing; returns (ok, message).
+
+    Used in-process by the web server. The CLI path is delete_specific_profile().
+    """
+    if not os.path.isdir(os.path.join(base_dir, "profiles", profile_name)):
+        return False, f"Profile '{profile_name}' not found"
+    ok, message, _ = remove_path(f"profiles/{profile_name}", f"profile '{profile_name}' directory", base_dir=base_dir)
+    return ok, message
+
+
+# Shown under --help, and when arguments are given without --profile
+_USAGE_EPILOG = """\
+examples:
+  python reset.py --profile john     # Delete only the 'john' profile
+  python reset.py --profile jane     # Delete only the 'jane' profile
+  python reset.py                    # Delete everything (full reset)
+
+what gets deleted (full reset):
+  • profiles/ directory (all user profiles and data)
+  • auth/tokens.json (legacy authentication tokens)
+  • auth/client.json (legacy client credentials)
+  • csv/ directory (legacy CSV data files)
+  • Any token backup files (*.bak)
+
+what gets deleted (profile-specific):
+  • profiles/<name>/ directory (specific profile and data)
+  • profiles/<name>/auth/ (authentication tokens and credentials)
+  • profiles/<name>/csv/ (CSV data files for that profile)
+  • Any token backup files for that profile
+
+what gets preserved:
+  • All application code (auth/, common/, fetch/, generate/)
+  • Configuration files (requirements.txt, Dockerfile, etc.)
+  • Web interface files (index.html, script.js, style.css)
+  • Documentation and assets
+  • Other profiles (when using --profile)
+"""
+
+
+def parse_args():
+    """Parse command line arguments (argparse is only imported when there are any)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Safely delete user data, profiles, and generated files to return "
+                    "the FitBaus application to a clean state.",
+        epilog=_USAGE_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
     parser.add_argument("--profile", help="Delete specific profile only (instead of all data)")
     parser.add_argument("--yes", action="store_true", help="Skip confirmation prompts (non-interactive mode)")
     args = parser.parse_args()
+    # A full reset is always interactive; arguments without --profile just show the help
+    if not args.profile:
+        parser.print_help()
+        parser.exit()
+    return args
+
+
+def main():
+    """Main reset function."""
+    # Parse command line arguments; the common bare `python reset.py` needs no parser
+    if len(sys.argv) > 1:
+        args = parse_args()
+    else:
+        args = SimpleNamespace(profile=None, yes=False)
     
     # If profile specified, delete only that profile
     if args.profile:
         return delete_specific_profile(args.profile, skip_confirmation=args.yes)
     
-    # Otherwise, show usage if any other arguments provided
-    if len(sys.argv) > 1:
-        show_usage()
-        return
-    
-    print_status("=" * 60, "INFO")
-    print_status("FitBaus Reset Script", "INFO")
-    print_status("=" * 60, "INFO")
-    print()
+    with batched_status():
+        print_status("=" * 60, "INFO")
+        print_status("FitBaus Reset Script", "INFO")
+        print_status("=" * 60, "INFO")
+        print_status("")
     
-    # Get the script directory (root of the project)
-    script_dir = Path(__file__).parent.absolute()
-    os.chdir(script_dir)
+    # Everything is resolved against the project root rather than the current directory
+    base_dir = BASE_DIR
     
-    print_status(f"Working directory: {script_dir}", "INFO")
+    print_status(f"Project directory: {base_dir}", "INFO")
     print()
     
     # Get user confirmation before proceeding
@@ -251,77 +421,83 @@ def main():
     # Track overall success
     all_success = True
     
-    # 1. Remove entire profiles directory
-    print_status("1. Removing user profiles directory...", "INFO")
-    profiles_path = "profiles"
-    if not safe_remove_path(profiles_path, "profiles directory"):
-        all_success = False
-    
-    # 2. Remove legacy auth files (for backward compatibility)
-    print_status("\n2. Removing legacy auth files...", "INFO")
+    # Legacy targets are independent of profiles/ and of each other, so they are removed
+    # on a small pool while profiles/ is deleted; results are reported in step order below
     legacy_auth_files = [
         ("auth/tokens.json", "legacy tokens file"),
         ("auth/client.json", "legacy client credentials file")
     ]
+    # Installs that never used the pre-profile layout have none of these; say so once
+    present_auth_files = [(file_path, description) for file_path, description in legacy_auth_files
+                          if os.path.lexists(os.path.join(base_dir, file_path))]
+    legacy_backups = list(iter_token_backups(base_dir, include_profiles=False))
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        auth_results = [pool.submit(remove_path, file_path, description, base_dir=base_dir)
+                        for file_path, description in present_auth_files]
+        csv_result = pool.submit(remove_path, "csv", "legacy CSV directory", base_dir=base_dir)
+        backup_results = [pool.submit(remove_path, backup_file, f"backup file {backup_file}", base_dir=base_dir)
+                          for backup_file in legacy_backups]
+    
+        # 1. Remove entire profiles directory
+        with batched_status():
+            print_status("1. Removing user profiles directory...", "INFO")
+            profiles_path = "profiles"
+            profiles_removed = safe_remove_path(profiles_path, "profiles directory", parallel=True, base_dir=base_dir)
+            if not profiles_removed:
+                all_success = False
     
-    for file_path, description in legacy_auth_files:
-        if not safe_remove_path(file_path, description):
-            all_success = False
+    # 2. Remove legacy auth files (for backward compatibility)
+    with batched_status():
+        print_status("\n2. Removing legacy auth files...", "INFO")
+        if not present_auth_files:
+            print_status("No legacy auth files found (already clean)", "INFO")
+        for future in auth_results:
+            ok, message, status = future.result()
+            print_status(message, status)
+            all_success = all_success and ok
     
     # 3. Remove legacy CSV directory (for backward compatibility)
-    print_status("\n3. Removing legacy CSV data directory...", "INFO")
-    csv_path = "csv"
-    if not safe_remove_path(csv_path, "legacy CSV directory"):
-        all_success = False
+    with batched_status():
+        print_status("\n3. Removing legacy CSV data directory...", "INFO")
+        ok, message, status = csv_result.result()
+        print_status(message, status)
+        all_success = all_success and ok
     
     # 4. Remove token backup files
-    print_status("\n4. Removing token backup files...", "INFO")
-    backup_patterns = [
-        "auth/tokens.json.bak",
-        "profiles/*/auth/tokens.json.bak"
-    ]
-    
-    backup_files_found = 0
-    for pattern in backup_patterns:
-        for backup_file in glob.glob(pattern):
-            if os.path.exists(backup_file):
+    with batched_status():
+        print_status("\n4. Removing token backup files...", "INFO")
+        for future in backup_results:
+            ok, message, status = future.result()
+            print_status(message, status)
+            all_success = all_success and ok
+        backup_files_found = len(backup_results)
+        # Per-profile backups went with profiles/ unless that removal failed
+        if not profiles_removed:
+            for backup_file in iter_token_backups(base_dir):
+                if backup_file in legacy_backups:
+                    continue
                 backup_files_found += 1
-                if not safe_remove_path(backup_file, f"backup file {backup_file}"):
+                if not safe_remove_path(backup_file, f"backup file {backup_file}", base_dir=base_dir):
                     all_success = False
-    
-    if backup_files_found == 0:
-        print_status("No token backup files found", "INFO")
-    
-    # 5. Verify clean state
-    print_status("\n5. Verifying clean state...", "INFO")
-    verification_paths = [
-        ("profiles", "profiles directory"),
-        ("auth/tokens.json", "legacy tokens file"),
-        ("auth/client.json", "legacy client credentials file"),
-        ("csv", "legacy CSV directory")
-    ]
-    
-    clean_state = True
-    for path, description in verification_paths:
-        if os.path.exists(path):
-            print_status(f"Warning: {description} still exists", "WARNING")
-            clean_state = False
+
+        if backup_files_found == 0:
+            print_status("No token backup files found", "INFO")
     
     # Summary
-    print_status("\n" + "=" * 60, "INFO")
-    if all_success and clean_state:
-        print_status("✅ Reset completed successfully!", "SUCCESS")
-        print_status("The application is now in a clean state with no users or data.", "SUCCESS")
-        print_status("You can now run the authentication process to create new profiles.", "INFO")
-    elif all_success:
-        print_status("Reset completed with warnings.", "WARNING")
-        print_status("Some files may still exist. Check the warnings above.", "WARNING")
-    else:
-        print_status("❌ Reset completed with errors.", "ERROR")
-        print_status("Some files could not be removed. Check the errors above.", "ERROR")
-        sys.exit(1)
-    
-    print_status("=" * 60, "INFO")
+    with batched_status():
+        print_status("\n" + "=" * 60, "INFO")
+        # Every removal above either succeeded (the path is gone) or was reported as an error
+        if all_success:
+            print_status("✅ Reset completed successfully!", "SUCCESS")
+            print_status("The application is now in a clean state with no users or data.", "SUCCESS")
+            print_status("You can now run the authentication process to create new profiles.", "INFO")
+        else:
+            print_status("❌ Reset completed with errors.", "ERROR")
+            print_status("Some files could not be removed. Check the errors above.", "ERROR")
+            sys.exit(1)
+
+        print_status("=" * 60, "INFO")
 
 
 if __name__ == "__main__":
@@ -6,82 +6,337 @@ while maintaining all existing static file serving functionality.
 """
 
 import os
+import pathlib
+import re
+import selectors
+import signal
 import subprocess
+import sys
 import threading
+import codecs
+import heapq
 import json
+import logging
 import time
-from datetime import datetime, date
-from flask import Flask, send_from_directory, send_file, request, jsonify
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from urllib.parse import urlencode
+from flask import Flask, Response, send_from_directory, send_file, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import NotFound
+
+import reset
+from auth.refresh_token import refresh as refresh_tokens
+from auth.authorize_fitbit import (
+    REDIRECT_URI as DEFAULT_REDIRECT_URI,
+    exchange_code_for_token,
+    extract_code_from_url,
+    sync_existing_profiles,
+)
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+
+def _json_loads(data: bytes):
+    """Parse JSON bytes with orjson when available"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes with orjson when available (2-space indent if requested)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def _read_json(path: str | os.PathLike):
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _write_json(path: str | os.PathLike, obj, indent: bool = False):
+    with open(path, 'wb') as f:
+        f.write(_json_dumps(obj, indent))
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """jsonify/get_json backed by orjson, with output matching the default provider
+    (sorted keys; dates, decimals and the like go through DefaultJSONProvider.default)"""
+
+    _OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype)
 
 app = Flask(__name__)
+
+# Per-profile data lives under profiles/<id>/ (relative to the working directory, like the fetch scripts)
+PROFILES_DIR = pathlib.Path('profiles')
+if orjson is not None:
+    app.json = _OrjsonProvider(app)
 CORS(app)  # Enable CORS for API endpoints
+# Behind nginx/apache with X-Sendfile enabled, let the proxy stream files from disk
+app.use_x_sendfile = os.getenv('FITBIT_X_SENDFILE', '').strip().lower() in ('1', 'true', 'yes')
 
 # Global state for tracking fetch operations
-class FetchJobsDict(dict):
-    def __init__(self):
-        super().__init__()
-        self._lock = threading.Lock()
-    
-    def __setitem__(self, key, value):
-        with self._lock:
-            print(f"[DEBUG] Setting fetch_jobs[{key}] = {value.get('status', 'unknown') if isinstance(value, dict) else value}")
-            super().__setitem__(key, value)
-            print(f"[DEBUG] fetch_jobs keys after set: {list(self.keys())}")
-    
-    def __delitem__(self, key):
-        with self._lock:
-            print(f"[DEBUG] Deleting fetch_jobs[{key}]")
-            super().__delitem__(key)
-            print(f"[DEBUG] fetch_jobs keys after delete: {list(self.keys())}")
-    
-    def clear(self):
-        with self._lock:
-            print(f"[DEBUG] WARNING: fetch_jobs.clear() called! Keys before clear: {list(self.keys())}")
-            print(f"[DEBUG] WARNING: Stack trace for clear() call:")
-            import traceback
-            traceback.print_stack()
-            super().clear()
-            print(f"[DEBUG] fetch_jobs cleared - now empty")
-    
-    def pop(self, key, default=None):
-        with self._lock:
-            if key in self:
-                print(f"[DEBUG] Popping fetch_jobs[{key}]")
-                result = super().pop(key, default)
-                print(f"[DEBUG] fetch_jobs keys after pop: {list(self.keys())}")
-                return result
-            return default
-
-fetch_jobs = FetchJobsDict()
-
-# Add a check to see if fetch_jobs gets reassigned
-_original_fetch_jobs = fetch_jobs
-def check_fetch_jobs_reassignment():
-    global fetch_jobs
-    if fetch_jobs is not _original_fetch_jobs:
-        print(f"[DEBUG] WARNING: fetch_jobs has been reassigned! Original: {_original_fetch_jobs}, Current: {fetch_jobs}")
-        print(f"[DEBUG] WARNING: Stack trace for reassignment:")
-        import traceback
-        traceback.print_stack()
-        fetch_jobs = _original_fetch_jobs  # Restore original
+fetch_jobs: OrderedDict[str, dict] = OrderedDict()
 # Track running fetch subprocesses by job_id for cancellation
 fetch_procs = {}
+# Ids of jobs whose fetch thread is running (kept in step with status so health is O(1))
+running_jobs: set[str] = set()
+# Queued/running job ids per profile, so per-profile lookups skip finished jobs
+profile_active_jobs: defaultdict[str, set[str]] = defaultdict(set)
+# Set by the fetch thread once a job is finalized (kept outside the JSON-served job dict)
+fetch_done: dict[str, threading.Event] = {}
+# Set when a job is cancelled, so its fetch thread stops tailing output right away
+fetch_cancel: dict[str, threading.Event] = {}
+# Pool futures per job; cancelling one that hasn't started yet skips the job entirely
+fetch_futures: dict[str, Future] = {}
+# Full-output log path per finished job; outlives the reaper so /api/fetch-log keeps
+# working after the job itself expires (newest MAX_JOBS entries kept)
+fetch_log_paths: OrderedDict[str, str] = OrderedDict()
 job_counter = 0
+# Held briefly around read-then-write job updates (creation, finalization, cancellation)
+# and job snapshots; re-entrant so helpers like _release_job can nest inside those sections
+fetch_jobs_lock = threading.RLock()
+
+def _release_job(profile_id, job_id):
+    """Drop a finished or cancelled job from running_jobs and profile_active_jobs"""
+    running_jobs.discard(job_id)
+    active = profile_active_jobs.get(profile_id)
+    if active is not None:
+        active.discard(job_id)
+        if not active:
+            del profile_active_jobs[profile_id]
+
+# Serializes in-process profile deletions (reset.delete_profile)
+profile_delete_lock = threading.Lock()
+
+# Bounded worker pools for fetch and authorization jobs; extra jobs wait as 'queued'
+# (threads are created on first submit, so gunicorn workers fork before any exist)
+fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fetch')
+auth_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='auth')
 
 # Global state for tracking authorization operations
-auth_jobs = {}
+auth_jobs: OrderedDict[str, dict] = OrderedDict()
 auth_job_counter = 0
+auth_jobs_lock = threading.Lock()
+
+# Finished authorization jobs stay readable this long before the reaper drops them
+AUTH_JOB_EXPIRY_SECONDS = 3600
+
+class _Job(dict):
+    """Fetch job dict with a `version` attribute bumped on every write (the fetch-status ETag).
+
+    Bookkeeping that clients don't need lives in attributes rather than keys, so the
+    served JSON is unchanged: `version`, plus the progress throttle state (`today`, the
+    fetch end date; `progress_start` and `progress_ts`, the range and time.monotonic()
+    of the last recompute).
+    """
+
+    __slots__ = ('version', 'today', 'progress_start', 'progress_ts')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self.today = None
+        self.progress_start = None
+        self.progress_ts = 0.0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+# Per-table cap; past it the oldest finished jobs are evicted early (running ones never)
+MAX_JOBS = 500
+_TERMINAL_STATUSES = frozenset({'completed', 'failed', 'cancelled', 'error', 'timeout'})
+
+def _add_job(jobs: OrderedDict, job_id: str, job: dict):
+    """Insert a job (newest last), evicting the oldest finished jobs while over MAX_JOBS"""
+    jobs[job_id] = job
+    jobs.move_to_end(job_id)
+    excess = len(jobs) - MAX_JOBS
+    if excess > 0:
+        stale = [jid for jid, j in jobs.items() if j.get('status') in _TERMINAL_STATUSES][:excess]
+        for jid in stale:
+            del jobs[jid]
+
+# Upper bound in seconds on a token refresh (requests, retries and backoff) before a fetch
+TOKEN_REFRESH_TIMEOUT = 30
+
+# Lines of fetch output kept in memory per job (the full output is in its log file)
+FETCH_OUTPUT_TAIL_LINES = 500
+# Full-output fetch logs kept per profile under profiles/<id>/logs (oldest are deleted)
+FETCH_LOGS_KEPT = 20
+
+# Environment for fetch subprocesses, built once: UTF-8, unbuffered output
+_BASE_ENV = {**os.environ, 'PYTHONIOENCODING': 'utf-8', 'PYTHONUNBUFFERED': '1'}
+
+# With verbose logging on, echo every Nth fetch output line (progress lines always)
+FETCH_CAPTURE_SAMPLE_EVERY = 50
 
 # Verbose logging configuration
 VERBOSE_FETCH_LOGGING = True  # Set to False to disable verbose fetch logging
 
 def _log_fetch(job_id: str, message: str, level: str = "INFO"):
-    """Helper function for verbose fetch logging"""
-    if VERBOSE_FETCH_LOGGING:
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"[{timestamp}] [FETCH-{job_id}] [{level}] {message}")
+    """Helper function for verbose fetch logging (dropped by the logger level when verbose logging is off)"""
+    # Non-standard levels such as "THROTTLE" are logged at INFO
+    logger.log(getattr(logging, level, logging.INFO), "[FETCH-%s] %s", job_id, message)
+
+# Debug lines are queued here and written in batches by a background drain thread,
+# so request and fetch threads never block on console I/O
+_dbg = deque(maxlen=4096)
+_dbg_pid = None
+_dbg_lock = threading.Lock()
+
+def _drain_dbg():
+    """Write queued debug lines to stdout in one batch every 250 ms"""
+    while True:
+        time.sleep(0.25)
+        lines = []
+        while _dbg:
+            try:
+                lines.append(_dbg.popleft())
+            except IndexError:
+                break
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+class _DeferredLogHandler(logging.Handler):
+    """Queue formatted records on _dbg; starts the drain thread once per process (workers fork after import)"""
+
+    def emit(self, record):
+        global _dbg_pid
+        try:
+            _dbg.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+        if _dbg_pid != os.getpid():
+            with _dbg_lock:
+                if _dbg_pid != os.getpid():
+                    threading.Thread(target=_drain_dbg, daemon=True).start()
+                    _dbg_pid = os.getpid()
+
+
+# Fetch progress goes out at INFO (only while VERBOSE_FETCH_LOGGING is on), job
+# bookkeeping traces at DEBUG (only with FITBIT_DEBUG set); records are formatted
+# lazily and written by the drain thread
+logger = logging.getLogger(__name__)
+_log_handler = _DeferredLogHandler()
+_log_handler.setFormatter(logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s", "%H:%M:%S"))
+logger.addHandler(_log_handler)
+logger.propagate = False
+
+def _apply_log_level():
+    """Set the logger level once, so disabled records are rejected before any formatting"""
+    if os.getenv('FITBIT_DEBUG', '').strip():
+        logger.setLevel(logging.DEBUG)
+    else:
+        logger.setLevel(logging.INFO if VERBOSE_FETCH_LOGGING else logging.WARNING)
+
+_apply_log_level()
+
+
+class _JobKeys:
+    """Current fetch_jobs keys, rendered only when a log record is actually formatted"""
+
+    def __str__(self):
+        return str(list(fetch_jobs))
+
 
+_JOB_KEYS = _JobKeys()
+
+# Finished jobs stay visible this long so the frontend can read their final status
+JOB_EXPIRY_SECONDS = 10
+
+# One reaper thread removes finished jobs from a (deadline, table, job_id) min-heap,
+# table being 'fetch' or 'auth'
+_expiry_heap: list[tuple[float, str, str]] = []
+_expiry_cv = threading.Condition()
+_reaper_pid = None
+
+def _reap_expired_jobs():
+    """Sleep until the earliest deadline, then drop that job from its table"""
+    while True:
+        with _expiry_cv:
+            while not _expiry_heap or _expiry_heap[0][0] > time.monotonic():
+                timeout = _expiry_heap[0][0] - time.monotonic() if _expiry_heap else None
+                _expiry_cv.wait(timeout)
+            _, table, job_id = heapq.heappop(_expiry_heap)
+        if table == 'auth':
+            with auth_jobs_lock:
+                auth_jobs.pop(job_id, None)
+            continue
+        fetch_done.pop(job_id, None)
+        fetch_cancel.pop(job_id, None)
+        fetch_futures.pop(job_id, None)
+        with fetch_jobs_lock:
+            removed = fetch_jobs.pop(job_id, None)
+        if removed is not None:
+            logger.debug("Cleaned up completed job %s after delay", job_id)
+
+def _schedule_expiry(job_id: str, deadline: float, table: str = 'fetch'):
+    """Queue a finished job for removal at the given time.monotonic() deadline"""
+    global _reaper_pid
+    with _expiry_cv:
+        heapq.heappush(_expiry_heap, (deadline, table, job_id))
+        _expiry_cv.notify()
+        if _reaper_pid != os.getpid():
+            threading.Thread(target=_reap_expired_jobs, daemon=True).start()
+            _reaper_pid = os.getpid()
+
+# (epoch second, ISO string) of the last now_iso() call; rebuilt once per wall-clock second
+_now_iso_cache = (0, '')
+
+def now_iso() -> str:
+    """Local time as a second-resolution ISO string, formatted at most once per second"""
+    global _now_iso_cache
+    t = int(time.time())
+    cached = _now_iso_cache
+    if cached[0] != t:
+        cached = (t, datetime.fromtimestamp(t).isoformat())
+        _now_iso_cache = cached
+    return cached[1]
+
+# Parsed tokens.json per path, reused until the file's mtime changes
+_TOKENS_CACHE: dict[str | os.PathLike, tuple[int, dict]] = {}
+
+def load_tokens(path: str | os.PathLike) -> dict:
+    """Load a profile's tokens JSON, re-parsing only when the file has changed"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _TOKENS_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        raw = f.read()
+    tokens = _json_loads(raw)
+    _TOKENS_CACHE[path] = (mtime, tokens)
+    return tokens
+
+# Fetch output repeats the same handful of dates many times; strptime is slow enough to memoize
+@lru_cache(maxsize=512)
 def _parse_date(s: str) -> date | None:
     try:
         return datetime.strptime(s, "%Y-%m-%d").date()
@@ -89,128 +344,415 @@ def _parse_date(s: str) -> date | None:
         return None
 
 
+# Valid profile names: letters, digits, hyphens, underscores (\Z rejects a trailing newline)
+_PROFILE_NAME_RE = re.compile(r'^[A-Za-z0-9_-]+\Z')
+
+# Map fetch script names to the CSV file each one writes
+_SCRIPT_TO_CSV = {
+    'fetch_steps.py': 'fitbit_activity.csv',
+    'fetch_rhr_data.py': 'fitbit_rhr.csv',
+    'fetch_hrv_data.py': 'fitbit_hrv.csv',
+    'fetch_sleep_data.py': 'fitbit_sleep.csv',
+    'fetch_sleep_data_alternate_version.py': 'fitbit_sleep.csv',
+}
+
+# Label used in the job message for each "Starting ... fetch from" line
+_RANGE_LABELS = {'activity data': 'Activity', 'resting hr': 'RHR', 'hrv': 'HRV', 'sleep data': 'Sleep'}
+
+# Progress/throttle patterns in priority order, each with a lowercase keyword that any
+# matching line must contain. A line is lowered once and only patterns whose keyword is
+# present are tried, so the common non-matching line costs a few substring scans instead
+# of a regex search. Each pattern's outer group names its handler (match.lastgroup).
+_FETCH_LINE_PATTERNS = [
+    (keyword, re.compile(pattern, re.IGNORECASE))
+    for keyword, pattern in (
+        ('starting', r"(?P<script_start>starting\s+(?P<script>fetch_\w+\.py)\.\.\.$)"),
+        ('starting ', r"(?P<range_start>starting (?P<kind>activity data|resting hr|hrv|sleep data) fetch from (?P<range_from>\S+))"),
+        ('fetching ', r"(?P<fetching>fetching (?P<chunk_from>\d{4}-\d{2}-\d{2}) to (?P<chunk_to>\d{4}-\d{2}-\d{2}))"),
+        ('saved ', r"(?P<saved>saved .*? to (?P<csv>\S+\.csv)(?:.*? up to (?P<saved_upto>\d{4}-\d{2}-\d{2}))?)"),
+        (' up to ', r"(?P<up_to> up to (?P<upto>\d{4}-\d{2}-\d{2}))"),
+        ('rate-limit headers', r"(?P<header_indicated>rate-limit headers indicate reset in\s+(?P<indicated_secs>\d+)s)"),
+        ('header reset for', r"(?P<header_wait>header reset for\s+(?P<wait_secs>\d+)s\.\.\.)"),
+        ('. waiting until', r"(?P<top_of_hour>^(?P<reason>.*?)\. waiting until (?P<until>\S+) \(top of hour)"),
+        ('retrying in', r"(?P<retry>retrying in\s+(?P<mmss>\d\d:\d\d))"),
+        ('resuming...', r"(?P<resume>^\s*resuming\.\.\.\s*$)"),
+    )
+]
+
+# Throttle messages (common/rate_limit.py and the fetchers) start with a fixed word, so
+# those lines, notably the once-a-second "Retrying in mm:ss" countdown, go straight to
+# their pattern
+_FETCH_FIRST_WORD_PATTERN = {
+    'rate-limit': _FETCH_LINE_PATTERNS[5][1],
+    'header': _FETCH_LINE_PATTERNS[6][1],
+    'retrying': _FETCH_LINE_PATTERNS[8][1],
+    'resuming...': _FETCH_LINE_PATTERNS[9][1],
+}
+
+
+def _update_progress(job, last_date_str: str | None):
+    """Set job progress from its start_date to last_date (or a tiny non-zero before any save)."""
+    try:
+        sd_str = job.get('start_date')
+        if not sd_str:
+            return
+        # Bursts of saved chunks can report many dates a second; the frontend polls far
+        # less often, so recompute at most once per second unless a new range started
+        now = time.monotonic()
+        if (last_date_str and sd_str == job.progress_start
+                and now - job.progress_ts < 1.0):
+            return
+        if last_date_str:
+            job.progress_start, job.progress_ts = sd_str, now
+        start_d = _parse_date(sd_str)
+        if not start_d:
+            return
+        today_d = job.today or date.today()
+        # If last_date not provided yet, do a tiny non-zero to show activity
+        last_d = _parse_date(last_date_str) if last_date_str else None
+        if not last_d:
+            last_d = start_d
+        total_days = max((today_d - start_d).days, 1)
+        done_days = max((min(last_d, today_d) - start_d).days, 0)
+        job['progress'] = max(0.0, min(1.0, done_days / total_days))
+    except Exception:
+        pass
+
+
+def _flush_progress(job):
+    """Apply the latest saved date that the once-per-second throttle may have skipped."""
+    if job.get('last_date'):
+        job.progress_ts = 0.0
+        _update_progress(job, job['last_date'])
+
+
+def _on_script_start(job_id, job, m):
+    # "[i/N] Starting fetch_xxx.py..." from fetch_all.py
+    _flush_progress(job)
+    script_name = m.group('script')
+    if script_name in _SCRIPT_TO_CSV:
+        job.update({
+            'current_script': script_name,
+            'current_csv': _SCRIPT_TO_CSV[script_name],
+            'message': f"Running {script_name}",
+        })
+
+
+def _on_range_start(job_id, job, m):
+    # "Starting <activity data|resting HR|HRV|sleep data> fetch from YYYY-MM-DD"
+    date_str = m.group('range_from')
+    job.update({
+        'start_date': date_str,
+        'message': f"{_RANGE_LABELS[m.group('kind').lower()]} from {date_str}",
+    })
+    _update_progress(job, None)
+
+
+def _on_fetching(job_id, job, m):
+    # "Fetching yyyy-mm-dd to yyyy-mm-dd..." only updates the message: it often names the
+    # target end (e.g. today) before anything is saved, which could briefly show 100%.
+    start_candidate, end_candidate = m.group('chunk_from', 'chunk_to')
+    if _parse_date(start_candidate) and _parse_date(end_candidate):
+        job['message'] = f"Fetching {start_candidate} → {end_candidate}"
+
+
+def _advance_last_date(job, end_str):
+    """Record a saved-through date and advance progress (ignores missing/invalid dates)"""
+    if end_str and _parse_date(end_str):
+        job['last_date'] = end_str
+        _update_progress(job, end_str)
+
+
+def _on_up_to(job_id, job, m):
+    # "... up to YYYY-MM-DD" advances progress
+    _advance_last_date(job, m.group('upto'))
+
+
+def _on_saved(job_id, job, m):
+    # "Saved ... to <csv> up to YYYY-MM-DD": capture CSV and last date
+    # (each pattern is compiled on its own, so only this one has a saved_upto group)
+    job['current_csv'] = os.path.basename(m.group('csv'))
+    _advance_last_date(job, m.group('saved_upto'))
+
+
+def _throttle_until(secs: int) -> str:
+    return (datetime.now() + timedelta(seconds=secs)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _on_header_indicated(job_id, job, m):
+    # "Rate-limit headers indicate reset in 27s."
+    secs = int(m.group('indicated_secs'))
+    until = _throttle_until(secs)
+    _log_fetch(job_id, f"THROTTLE: Rate-limit headers indicate reset in {secs}s (until {until})", "THROTTLE")
+    job.update({'throttle_active': True, 'throttle_reason': 'Header reset', 'throttle_until': until, 'throttle_mmss': None})
+
+
+def _on_header_wait(job_id, job, m):
+    # "Header reset for 1200s..."
+    secs = int(m.group('wait_secs'))
+    until = _throttle_until(secs)
+    logger.info("[FETCH-%s] THROTTLE: Header reset for %ss (until %s)", job_id, secs, until)
+    job.update({'throttle_active': True, 'throttle_reason': 'Header reset', 'throttle_until': until, 'throttle_mmss': None})
+
+
+def _on_top_of_hour(job_id, job, m):
+    # "Rate limited (429). Waiting until 14:00:05 (top of hour + 5s)..."
+    reason, until = m.group('reason', 'until')
+    logger.info("[FETCH-%s] THROTTLE: %s - waiting until %s (top of hour)", job_id, reason, until)
+    job.update({'throttle_active': True, 'throttle_reason': reason, 'throttle_until': until, 'throttle_mmss': None})
+
+
+def _on_retry(job_id, job, m):
+    # "Retrying in MM:SS" - only update throttle_mmss every 10 seconds to reduce server load
+    current_time = time.time()
+    if current_time - job.get('_last_countdown_update', 0) < 10:
+        return
+    mmss = m.group('mmss')
+    logger.info("[FETCH-%s] THROTTLE: %s - retrying in %s", job_id, job.get('throttle_reason', 'Backoff'), mmss)
+    job.update({
+        'throttle_active': True,
+        # Keep existing reason if set; otherwise generic
+        'throttle_reason': job.get('throttle_reason') or 'Backoff',
+        'throttle_mmss': mmss,
+        '_last_countdown_update': current_time,
+    })
+
+
+def _on_resume(job_id, job, m):
+    # Countdown completion
+    logger.info("[FETCH-%s] THROTTLE: Resuming after throttling period", job_id)
+    job.update({'throttle_active': False, 'throttle_reason': None, 'throttle_mmss': None, 'throttle_until': None})
+
+
+_FETCH_LINE_HANDLERS = {
+    'script_start': _on_script_start,
+    'range_start': _on_range_start,
+    'fetching': _on_fetching,
+    'saved': _on_saved,
+    'up_to': _on_up_to,
+    'header_indicated': _on_header_indicated,
+    'header_wait': _on_header_wait,
+    'top_of_hour': _on_top_of_hour,
+    'retry': _on_retry,
+    'resume': _on_resume,
+}
+
+def _match_fetch_line(line: str):
+    """Match one line of fetch output against _FETCH_LINE_PATTERNS (first word, then keywords)"""
+    pattern = _FETCH_FIRST_WORD_PATTERN.get(line[:12].split(' ', 1)[0].lower())
+    if pattern is not None:
+        m = pattern.match(line)
+        if m:
+            return m
+    low = line.lower()
+    for keyword, pattern in _FETCH_LINE_PATTERNS:
+        if keyword in low:
+            m = pattern.search(line)
+            if m:
+                return m
+    return None
+
+
+def _iter_output_lines(stream, chunk_size=65536):
+    """Yield decoded lines (newline-terminated) from a binary pipe.
+
+    read1 returns whatever is already buffered or one OS read of up to chunk_size, so
+    the child's writes are drained in large chunks instead of one line at a time.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    while True:
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            break
+        # Normalize Windows line endings (a CRLF split across chunks rejoins in pending)
+        pending = (pending + decoder.decode(chunk)).replace('\r\n', '\n')
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def _prune_fetch_logs(log_dir, keep):
+    """Delete all but the newest `keep` fetch logs in log_dir (best effort)"""
+    try:
+        with os.scandir(log_dir) as it:
+            logs = [(e.stat().st_mtime_ns, e.path) for e in it if e.name.endswith('.log') and e.is_file()]
+    except OSError:
+        return
+    logs.sort(reverse=True)
+    for _, path in logs[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _open_fetch_log(profile_id, job_id):
+    """Open profiles/<id>/logs/<time>-<pid>-<job_id>.log for the job's full output, or None if not writable.
+
+    Job ids restart in every process, so the timestamp and pid keep restarts and
+    gunicorn workers from sharing a file; only the newest FETCH_LOGS_KEPT logs are kept.
+    """
+    try:
+        log_dir = PROFILES_DIR / profile_id / 'logs'
+        os.makedirs(log_dir, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{job_id}.log"
+        log_f = open(log_dir / name, 'w', encoding='utf-8', buffering=1 << 16)
+    except Exception as e:
+        logger.warning("[FETCH-%s] Could not open output log: %s", job_id, e)
+        return None
+    _prune_fetch_logs(log_dir, FETCH_LOGS_KEPT)
+    return log_f
+
+
+def _cancel_requested(job_id):
+    """True once cancel_fetch/delete_profile has asked this job to stop"""
+    cancel = fetch_cancel.get(job_id)
+    return cancel is not None and cancel.is_set()
+
+
+def _finish_job(job_id, fields, flush_progress=False):
+    """Apply the fetch thread's final fields to a job, never undoing a cancellation.
+
+    - A job already marked cancelled only takes the non-status fields (output, return code...)
+    - A job whose cancel was requested is finalized as cancelled, whatever the exit status
+    Returns the job, or None if it is gone.
+    """
+    with fetch_jobs_lock:
+        job = fetch_jobs.get(job_id)
+        if job is None:
+            return None
+        if flush_progress:
+            _flush_progress(job)
+        if job.get('status') == 'cancelled':
+            fields = {k: v for k, v in fields.items() if k not in ('status', 'end_time', 'error')}
+        elif _cancel_requested(job_id):
+            fields = {**fields, 'status': 'cancelled', 'end_time': now_iso(), 'error': 'Cancelled'}
+        job.update(fields)
+        return job
+
+
 def run_fetch_script(profile_id, job_id):
     """Run fetch_all.py script in background thread with live status updates"""
+    log_f = None
     try:
-        print(f"[DEBUG] Thread started for job {job_id}")
-        print(f"[DEBUG] Current fetch_jobs keys at thread start: {list(fetch_jobs.keys())}")
+        logger.debug("Thread started for job %s", job_id)
+        logger.debug("Current fetch_jobs keys at thread start: %s", _JOB_KEYS)
         
         # Check if job exists at thread start
         if job_id not in fetch_jobs:
-            print(f"[DEBUG] ERROR: Job {job_id} not found at thread start!")
+            logger.debug("ERROR: Job %s not found at thread start!", job_id)
             return
         
         _log_fetch(job_id, f"Starting fetch operation for profile: {profile_id}")
-        _log_fetch(job_id, f"Job created at: {datetime.now().isoformat()}")
+        _log_fetch(job_id, f"Job created at: {now_iso()}")
         
         # Update job status
-        print(f"[DEBUG] Updating job {job_id} status to running")
-        if job_id not in fetch_jobs:
-            print(f"[DEBUG] ERROR: Job {job_id} not found in fetch_jobs during status update!")
-            print(f"[DEBUG] Available jobs: {list(fetch_jobs.keys())}")
+        logger.debug("Updating job %s status to running", job_id)
+        with fetch_jobs_lock:
+            job = fetch_jobs.get(job_id)
+            if job is not None and (job.get('status') == 'cancelled' or _cancel_requested(job_id)):
+                # Cancelled between being picked up by the pool and starting
+                logger.debug("Job %s was cancelled before it started", job_id)
+                return
+            if job is not None:
+                job.update({
+                    'status': 'running',
+                    'start_time': now_iso(),
+                    # Progress-related fields
+                    'current_csv': None,
+                    'start_date': None,
+                    'last_date': None,
+                    'progress': 0.0,
+                    'current_script': None,
+                    'message': 'Preparing fetch',
+                    # Throttling state (API rate limit/backoff)
+                    'throttle_active': False,
+                    'throttle_reason': None,
+                    'throttle_mmss': None,
+                    'throttle_until': None,
+                })
+                # Progress bookkeeping (attributes, not served): fetch end date and last recompute time
+                job.today = date.today()
+                job.progress_ts = 0.0
+                running_jobs.add(job_id)
+        if job is None:
+            logger.debug("ERROR: Job %s not found in fetch_jobs during status update!", job_id)
+            logger.debug("Available jobs: %s", _JOB_KEYS)
             return
-        fetch_jobs[job_id]['status'] = 'running'
-        fetch_jobs[job_id]['start_time'] = datetime.now().isoformat()
-        print(f"[DEBUG] Job {job_id} status updated, fetch_jobs keys: {list(fetch_jobs.keys())}")
-        # Initialize progress-related fields
-        fetch_jobs[job_id]['current_csv'] = None
-        fetch_jobs[job_id]['start_date'] = None
-        fetch_jobs[job_id]['last_date'] = None
-        fetch_jobs[job_id]['progress'] = 0.0
-        fetch_jobs[job_id]['current_script'] = None
-        fetch_jobs[job_id]['message'] = 'Preparing fetch'
-        # Throttling state (API rate limit/backoff)
-        fetch_jobs[job_id]['throttle_active'] = False
-        fetch_jobs[job_id]['throttle_reason'] = None
-        fetch_jobs[job_id]['throttle_mmss'] = None
-        fetch_jobs[job_id]['throttle_until'] = None
+        logger.debug("Job %s status updated, fetch_jobs keys: %s", job_id, _JOB_KEYS)
         
         _log_fetch(job_id, "Job state initialized - status: running")
         
         # Check if profile needs re-authorization first
-        tokens_file = f'profiles/{profile_id}/auth/tokens.json'
-        print(f"[FETCH-{job_id}] Checking tokens file: {tokens_file}")
+        tokens_file = PROFILES_DIR / profile_id / 'auth' / 'tokens.json'
+        logger.info("[FETCH-%s] Checking tokens file: %s", job_id, tokens_file)
         if not os.path.exists(tokens_file):
-            print(f"[FETCH-{job_id}] ERROR: Profile {profile_id} not found. Go to Profile Management -> New Profile")
-            fetch_jobs[job_id]['status'] = 'failed'
-            fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-            fetch_jobs[job_id]['error'] = f'Profile {profile_id} not found. Go to Profile Management -> New Profile'
+            logger.error("[FETCH-%s] Profile %s not found. Go to Profile Management -> New Profile", job_id, profile_id)
+            _finish_job(job_id, {
+                'status': 'failed',
+                'end_time': now_iso(),
+                'error': f'Profile {profile_id} not found. Go to Profile Management -> New Profile',
+            })
             return
-        print(f"[FETCH-{job_id}] Tokens file found, proceeding with validation")
+        logger.info("[FETCH-%s] Tokens file found, proceeding with validation", job_id)
         
         # Check if profile has valid tokens before attempting refresh
         
         try:
-            import json
-            print(f"[FETCH-{job_id}] Loading tokens from file...")
-            with open(tokens_file, 'r') as f:
-                tokens = json.load(f)
+            logger.info("[FETCH-%s] Loading tokens from file...", job_id)
+            tokens = load_tokens(tokens_file)
             
-            print(f"[FETCH-{job_id}] Tokens loaded successfully. Keys: {list(tokens.keys()) if tokens else 'empty'}")
+            logger.info("[FETCH-%s] Tokens loaded successfully. Keys: %s", job_id, list(tokens) if tokens else 'empty')
             
             # Check if tokens file is empty or missing refresh token
             if not tokens or 'refresh_token' not in tokens or not tokens.get('refresh_token'):
-                print(f"[FETCH-{job_id}] ERROR: Profile {profile_id} needs authorization. Tokens: {tokens}")
-                fetch_jobs[job_id]['status'] = 'failed'
-                fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-                fetch_jobs[job_id]['error'] = f'Profile {profile_id} needs authorization. Go to Profile Management -> Existing Profiles -> Auth'
+                logger.error("[FETCH-%s] Profile %s needs authorization (no refresh_token)", job_id, profile_id)
+                _finish_job(job_id, {
+                    'status': 'failed',
+                    'end_time': now_iso(),
+                    'error': f'Profile {profile_id} needs authorization. Go to Profile Management -> Existing Profiles -> Auth',
+                })
                 return
-            print(f"[FETCH-{job_id}] Tokens validation passed, refresh_token present")
+            logger.info("[FETCH-%s] Tokens validation passed, refresh_token present", job_id)
             
             # Try to refresh the token first
-            print(f"[FETCH-{job_id}] Attempting to refresh token for profile {profile_id}...")
-            
-            # Set environment variable for profile
-            env = os.environ.copy()
-            env['FITBIT_PROFILE'] = profile_id
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONUNBUFFERED'] = '1'
+            logger.info("[FETCH-%s] Attempting to refresh token for profile %s...", job_id, profile_id)
             
-            print(f"[FETCH-{job_id}] Running token refresh subprocess...")
-            refresh_result = subprocess.run(
-                ['python', 'auth/refresh_token.py'],
-                cwd=os.getcwd(),
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                env=env,
-                timeout=30
-            )
-            print(f"[FETCH-{job_id}] Token refresh completed. Return code: {refresh_result.returncode}")
+            # Refresh in-process: the profile is passed explicitly, so no env mutation is needed;
+            # the timeout bounds the whole refresh like the old subprocess timeout did
+            ok, refresh_msg = refresh_tokens(profile_id, timeout=TOKEN_REFRESH_TIMEOUT)
+            logger.info("[FETCH-%s] Token refresh completed. Success: %s", job_id, ok)
             
-            if refresh_result.returncode != 0:
-                print(f"Token refresh failed for profile {profile_id}. Re-authorization needed.")
-                print(f"Refresh error: {refresh_result.stderr}")
+            if not ok:
+                logger.error("Token refresh failed for profile %s. Re-authorization needed.", profile_id)
+                logger.error("Refresh error: %s", refresh_msg)
                 
-                # Extract the specific error message from stderr, clean it up
-                error_msg = refresh_result.stderr.strip()
-                if not error_msg:
-                    error_msg = refresh_result.stdout.strip()
-                if not error_msg:
-                    error_msg = "Token refresh failed"
-                
-                # Clean up the error message to remove file paths and verbose details
-                if "[fitbit] Error:" in error_msg:
-                    error_msg = error_msg.split("[fitbit] Error:")[-1].strip()
-                if "Token file not found:" in error_msg:
-                    error_msg = "Token file not found"
+                # Keep the user-facing message short
+                error_msg = refresh_msg
                 if "Refresh token is invalid or expired" in error_msg:
                     error_msg = "Refresh token is invalid or expired"
                 
-                fetch_jobs[job_id]['status'] = 'failed'
-                fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-                fetch_jobs[job_id]['error'] = f'Token refresh failed: {error_msg}. Go to Profile Management -> Existing Profiles -> Auth'
+                _finish_job(job_id, {
+                    'status': 'failed',
+                    'end_time': now_iso(),
+                    'error': f'Token refresh failed: {error_msg}. Go to Profile Management -> Existing Profiles -> Auth',
+                })
                 return
             else:
-                print(f"Token refresh successful for profile {profile_id}")
-                print(f"Refresh output: {refresh_result.stdout}")
+                logger.info("Token refresh successful for profile %s", profile_id)
+                logger.info("Refresh output: %s", refresh_msg)
                 
         except Exception as e:
-            print(f"Error checking/refreshing tokens for profile {profile_id}: {e}")
-            fetch_jobs[job_id]['status'] = 'failed'
-            fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-            fetch_jobs[job_id]['error'] = f'Error checking tokens: {e}'
+            logger.error("Error checking/refreshing tokens for profile %s: %s", profile_id, e)
+            _finish_job(job_id, {
+                'status': 'failed',
+                'end_time': now_iso(),
+                'error': f'Error checking tokens: {e}',
+            })
             return
         
         # Prepare command
@@ -218,23 +760,23 @@ def run_fetch_script(profile_id, job_id):
         if profile_id:
             cmd.extend(['--profile', profile_id])
         
-        print(f"Running command: {' '.join(cmd)}")
-        print(f"Working directory: {os.getcwd()}")
-        print(f"Profile ID: {profile_id}")
+        logger.info("Running command: %s", ' '.join(cmd))
+        logger.info("Working directory: %s", os.getcwd())
+        logger.info("Profile ID: %s", profile_id)
         
-        # Set environment variables for proper Unicode handling
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        env['PYTHONUNBUFFERED'] = '1'
-        
-        print("=" * 60)
-        print("FETCH SCRIPT OUTPUT:")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info("FETCH SCRIPT OUTPUT:")
+        logger.info("=" * 60)
         
         # Check if job still exists before starting subprocess
         if job_id not in fetch_jobs:
-            print(f"[DEBUG] ERROR: Job {job_id} not found before subprocess start!")
-            print(f"[DEBUG] Current fetch_jobs keys: {list(fetch_jobs.keys())}")
+            logger.debug("ERROR: Job %s not found before subprocess start!", job_id)
+            logger.debug("Current fetch_jobs keys: %s", _JOB_KEYS)
+            return
+        # A cancel during the token refresh found no process to stop: honour it here
+        if _cancel_requested(job_id):
+            logger.info("[FETCH-%s] Cancelled before fetch_all.py started", job_id)
+            _finish_job(job_id, {})
             return
         
         # Stream the script output to update progress
@@ -243,310 +785,177 @@ def run_fetch_script(profile_id, job_id):
             cwd=os.getcwd(),
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=0,  # Unbuffered for immediate output
-            universal_newlines=True,
-            encoding='utf-8',
-            errors='replace',
-            env=env,
+            bufsize=1 << 20,  # Binary pipe; drained in large chunks by _iter_output_lines
+            start_new_session=True,  # own process group, so cancellation reaches grandchildren (POSIX)
+            env=_BASE_ENV,
         )
         # Record process handle for potential cancellation
         fetch_procs[job_id] = proc
+        # A canceller that ran between the check above and this registration saw no process
+        if _cancel_requested(job_id):
+            _signal_fetch_proc(proc, kill=True)
 
-        # Track and parse progress from child output
-        output_lines: list[str] = []
-        # Map script names to CSV file names
-        script_to_csv = {
-            'fetch_steps.py': 'fitbit_activity.csv',
-            'fetch_rhr_data.py': 'fitbit_rhr.csv',
-            'fetch_hrv_data.py': 'fitbit_hrv.csv',
-            'fetch_sleep_data.py': 'fitbit_sleep.csv',
-            'fetch_sleep_data_alternate_version.py': 'fitbit_sleep.csv',
-        }
-
-        def update_progress_for(last_date_str: str | None):
-            try:
-                sd_str = fetch_jobs[job_id].get('start_date')
-                if not sd_str:
-                    return
-                start_d = _parse_date(sd_str)
-                if not start_d:
-                    return
-                today_d = date.today()
-                # If last_date not provided yet, do a tiny non-zero to show activity
-                if last_date_str:
-                    last_d = _parse_date(last_date_str)
-                else:
-                    last_d = None
-                if not last_d:
-                    last_d = start_d
-                total_days = max((today_d - start_d).days, 1)
-                done_days = max((min(last_d, today_d) - start_d).days, 0)
-                progress = max(0.0, min(1.0, done_days / total_days))
-                fetch_jobs[job_id]['progress'] = progress
-            except Exception:
-                pass
+        # Full output goes to a per-job log file; only the tail is kept in memory
+        log_f = _open_fetch_log(profile_id, job_id)
+        tail = deque(maxlen=FETCH_OUTPUT_TAIL_LINES)
 
+        cancel = fetch_cancel.get(job_id)
         assert proc.stdout is not None
-        for raw in proc.stdout:
+        for line_no, raw in enumerate(_iter_output_lines(proc.stdout), 1):
+            if cancel is not None and cancel.is_set():
+                break
             line = raw.rstrip("\n")
-            output_lines.append(line)
-            # Debug: print what we're capturing
-            print(f"[FETCH-{job_id}] CAPTURED: {line}")
+            tail.append(line)
+            if log_f is not None:
+                log_f.write(raw)
             
             # Check if job still exists during output processing
-            if job_id not in fetch_jobs:
-                print(f"[DEBUG] ERROR: Job {job_id} disappeared during output processing!")
-                print(f"[DEBUG] Current fetch_jobs keys: {list(fetch_jobs.keys())}")
+            job = fetch_jobs.get(job_id)
+            if job is None:
+                logger.debug("ERROR: Job %s disappeared during output processing!", job_id)
+                logger.debug("Current fetch_jobs keys: %s", _JOB_KEYS)
                 break
-            # Lightweight parsing of progress-relevant lines
-            low = line.lower()
-            # Detect which script is running
-            # Pattern: "[i/N] Starting fetch_xxx.py..." from fetch_all.py
-            if 'starting' in low and 'fetch_' in low and low.endswith('...'):
-                try:
-                    name = line.split('Starting', 1)[1].strip().strip('.').strip('.').strip()
-                    # name may include ellipsis; reduce to the script filename
-                    parts = name.split()
-                    script_name = parts[0] if parts else ''
-                    if script_name in script_to_csv:
-                        fetch_jobs[job_id]['current_script'] = script_name
-                        fetch_jobs[job_id]['current_csv'] = script_to_csv[script_name]
-                        fetch_jobs[job_id]['message'] = f"Running {script_name}"
-                except Exception:
-                    pass
-
-            # Starting range lines per script
-            # Steps: Starting activity data fetch from YYYY-MM-DD
-            if 'starting activity data fetch from ' in low:
-                try:
-                    idx = low.index('starting activity data fetch from ')
-                    date_str = line[idx:].split('from',1)[1].strip().split()[0]
-                    fetch_jobs[job_id]['start_date'] = date_str
-                    fetch_jobs[job_id]['message'] = f"Activity from {date_str}"
-                    update_progress_for(None)
-                except Exception:
-                    pass
-            # RHR: Starting resting HR fetch from YYYY-MM-DD
-            if 'starting resting hr fetch from ' in low:
-                try:
-                    idx = low.index('starting resting hr fetch from ')
-                    date_str = line[idx:].split('from',1)[1].strip().split()[0]
-                    fetch_jobs[job_id]['start_date'] = date_str
-                    fetch_jobs[job_id]['message'] = f"RHR from {date_str}"
-                    update_progress_for(None)
-                except Exception:
-                    pass
-            # HRV: Starting HRV fetch from YYYY-MM-DD
-            if 'starting hrv fetch from ' in low:
-                try:
-                    idx = low.index('starting hrv fetch from ')
-                    date_str = line[idx:].split('from',1)[1].strip().split()[0]
-                    fetch_jobs[job_id]['start_date'] = date_str
-                    fetch_jobs[job_id]['message'] = f"HRV from {date_str}"
-                    update_progress_for(None)
-                except Exception:
-                    pass
-            # Sleep: Starting sleep data fetch from YYYY-MM-DD to YYYY-MM-DD
-            if 'starting sleep data fetch from ' in low:
-                try:
-                    idx = low.index('starting sleep data fetch from ')
-                    rest = line[idx:].split('from',1)[1].strip()
-                    date_str = rest.split()[0]
-                    fetch_jobs[job_id]['start_date'] = date_str
-                    fetch_jobs[job_id]['message'] = f"Sleep from {date_str}"
-                    update_progress_for(None)
-                except Exception:
-                    pass
-
-            # Chunk lines: "Fetching yyyy-mm-dd to yyyy-mm-dd..."
-            # Do not update last_date here; this line often prints the target end (e.g., today)
-            # before any data is actually saved, which can briefly show 100%.
-            # We rely on "Saved ... up to YYYY-MM-DD" lines to advance progress accurately.
-            if 'fetching ' in low and ' to ' in low:
-                try:
-                    # Optionally update the message to reflect current activity without affecting progress
-                    parts = line.strip().split()
-                    dates = [p for p in parts if len(p) == 10 and p[4] == '-' and p[7] == '-']
-                    if len(dates) >= 2:
-                        start_candidate = dates[0]
-                        end_candidate = dates[1]
-                        if _parse_date(start_candidate) and _parse_date(end_candidate):
-                            fetch_jobs[job_id]['message'] = f"Fetching {start_candidate} → {end_candidate}"
-                except Exception:
-                    pass
-
-            # Saved lines: capture CSV and last date: "Saved ... to <csv> up to YYYY-MM-DD"
-            if 'saved ' in low and ' to ' in low:
-                try:
-                    # Try to infer CSV filename
-                    parts = line.strip().split()
-                    csv_tokens = [p for p in parts if p.endswith('.csv')]
-                    if csv_tokens:
-                        fetch_jobs[job_id]['current_csv'] = os.path.basename(csv_tokens[-1])
-                except Exception:
-                    pass
-            if ' up to ' in low:
+            # Progress/throttle lines: the matched pattern picks the handler
+            m = _match_fetch_line(line)
+            # Echo progress lines and a 1-in-N sample of the rest (the log file has everything)
+            if (m or line_no % FETCH_CAPTURE_SAMPLE_EVERY == 0) and logger.isEnabledFor(logging.INFO):
+                logger.info("[FETCH-%s] CAPTURED: %s", job_id, line)
+            if m:
                 try:
-                    after = line.lower().split(' up to ', 1)[1]
-                    end_str = after.strip().split()[0]
-                    # Validate date
-                    if _parse_date(end_str):
-                        fetch_jobs[job_id]['last_date'] = end_str
-                        update_progress_for(end_str)
-                except Exception:
-                    pass
-
-            # Detect throttling/backoff and countdowns
-            # Header-provided reset seconds
-            if 'rate-limit headers indicate reset in ' in low and 's' in low:
-                try:
-                    # e.g., "Rate-limit headers indicate reset in 27s."
-                    import re
-                    m = re.search(r"reset in\s+(\d+)s", low)
-                    if m:
-                        secs = int(m.group(1))
-                        from datetime import timedelta
-                        until = (datetime.now() + timedelta(seconds=secs)).strftime('%Y-%m-%d %H:%M:%S')
-                        _log_fetch(job_id, f"THROTTLE: Rate-limit headers indicate reset in {secs}s (until {until})", "THROTTLE")
-                        fetch_jobs[job_id]['throttle_active'] = True
-                        fetch_jobs[job_id]['throttle_reason'] = 'Header reset'
-                        fetch_jobs[job_id]['throttle_until'] = until
-                        fetch_jobs[job_id]['throttle_mmss'] = None
-                except Exception as e:
-                    print(f"[FETCH-{job_id}] ERROR parsing rate-limit reset: {e}")
-                    pass
-            # Header reset countdown: "Header reset for Xs..."
-            if 'header reset for ' in low and 's...' in low:
-                try:
-                    # e.g., "Header reset for 1200s..."
-                    import re
-                    m = re.search(r"header reset for\s+(\d+)s", low)
-                    if m:
-                        secs = int(m.group(1))
-                        from datetime import timedelta
-                        until = (datetime.now() + timedelta(seconds=secs)).strftime('%Y-%m-%d %H:%M:%S')
-                        print(f"[FETCH-{job_id}] THROTTLE: Header reset for {secs}s (until {until})")
-                        fetch_jobs[job_id]['throttle_active'] = True
-                        fetch_jobs[job_id]['throttle_reason'] = 'Header reset'
-                        fetch_jobs[job_id]['throttle_until'] = until
-                        fetch_jobs[job_id]['throttle_mmss'] = None
-                except Exception as e:
-                    print(f"[FETCH-{job_id}] ERROR parsing header reset: {e}")
-                    pass
-            # Top-of-hour wait message
-            if 'waiting until ' in low and 'top of hour' in low:
-                try:
-                    # e.g., "Waiting until 14:00:05 (top of hour + 5s)..."
-                    after = low.split('waiting until ', 1)[1]
-                    until = after.split()[0]
-                    # Extract reason prefix (text before ". Waiting") if present
-                    reason = line.split('. Waiting', 1)[0]
-                    print(f"[FETCH-{job_id}] THROTTLE: {reason} - waiting until {until} (top of hour)")
-                    fetch_jobs[job_id]['throttle_active'] = True
-                    fetch_jobs[job_id]['throttle_reason'] = reason
-                    fetch_jobs[job_id]['throttle_until'] = until
-                    fetch_jobs[job_id]['throttle_mmss'] = None
+                    _FETCH_LINE_HANDLERS[m.lastgroup](job_id, job, m)
                 except Exception as e:
-                    print(f"[FETCH-{job_id}] ERROR parsing top-of-hour wait: {e}")
-                    pass
-            # Generic countdown: "Retrying in MM:SS" - only update throttle_mmss occasionally
-            if 'retrying in ' in low:
-                try:
-                    # Only update throttle_mmss every 10 seconds to reduce server load
-                    import time
-                    current_time = time.time()
-                    last_update = fetch_jobs[job_id].get('_last_countdown_update', 0)
-                    
-                    if current_time - last_update >= 10:  # Update every 10 seconds
-                        # Extract last token like 12:34
-                        parts = line.strip().split()
-                        mmss = None
-                        for p in parts[::-1]:
-                            if len(p) == 5 and p[2] == ':' and p[:2].isdigit() and p[3:].isdigit():
-                                mmss = p
-                                break
-                        if mmss:
-                            current_reason = fetch_jobs[job_id].get('throttle_reason', 'Backoff')
-                            print(f"[FETCH-{job_id}] THROTTLE: {current_reason} - retrying in {mmss}")
-                            fetch_jobs[job_id]['throttle_active'] = True
-                            # Keep existing reason if set; otherwise generic
-                            if not fetch_jobs[job_id].get('throttle_reason'):
-                                fetch_jobs[job_id]['throttle_reason'] = 'Backoff'
-                            fetch_jobs[job_id]['throttle_mmss'] = mmss
-                            fetch_jobs[job_id]['_last_countdown_update'] = current_time
-                except Exception as e:
-                    print(f"[FETCH-{job_id}] ERROR parsing retry countdown: {e}")
-                    pass
-            # Countdown completion
-            if low.strip() == 'resuming...':
-                print(f"[FETCH-{job_id}] THROTTLE: Resuming after throttling period")
-                fetch_jobs[job_id]['throttle_active'] = False
-                fetch_jobs[job_id]['throttle_reason'] = None
-                fetch_jobs[job_id]['throttle_mmss'] = None
-                fetch_jobs[job_id]['throttle_until'] = None
+                    logger.error("[FETCH-%s] Error parsing %s line: %s", job_id, m.lastgroup, e)
 
         return_code = proc.wait()
-        print(f"[FETCH-{job_id}] Process completed with return code: {return_code}")
-        print(f"[FETCH-{job_id}] Job status before finalization: {fetch_jobs.get(job_id, {}).get('status', 'NOT_FOUND')}")
+        if log_f is not None:
+            log_f.close()
+        logger.info("[FETCH-%s] Process completed with return code: %s", job_id, return_code)
+        logger.debug("[FETCH-%s] Job status before finalization: %s", job_id, fetch_jobs.get(job_id, {}).get('status', 'NOT_FOUND'))
 
         # Finalize job
-        out_text = "\n".join(output_lines)
-        print(f"[FETCH-{job_id}] STORED OUTPUT LENGTH: {len(out_text)} characters")
-        print(f"[FETCH-{job_id}] STORED OUTPUT PREVIEW: {out_text[:200]}...")
-        print(f"[FETCH-{job_id}] RETURN CODE: {return_code}")
-        if job_id in fetch_jobs:
-            fetch_jobs[job_id]['status'] = 'completed' if return_code == 0 else 'failed'
-            fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-            fetch_jobs[job_id]['return_code'] = return_code
-            fetch_jobs[job_id]['output'] = out_text
-            fetch_jobs[job_id]['error'] = None
-            
-            print(f"[FETCH-{job_id}] Job finalized with status: {fetch_jobs[job_id]['status']}")
+        out_text = "\n".join(tail)
+        logger.info("[FETCH-%s] STORED OUTPUT TAIL: %s lines, full log: %s", job_id, len(tail), log_f.name if log_f else 'n/a')
+        logger.debug("[FETCH-%s] STORED OUTPUT PREVIEW: %.200s...", job_id, out_text)
+        if log_f is not None:
+            with fetch_jobs_lock:
+                fetch_log_paths[job_id] = os.path.abspath(log_f.name)
+                while len(fetch_log_paths) > MAX_JOBS:
+                    fetch_log_paths.popitem(last=False)
+        job = _finish_job(job_id, {
+            'status': 'completed' if return_code == 0 else 'failed',
+            'end_time': now_iso(),
+            'return_code': return_code,
+            'output': out_text,
+            'output_path': os.path.abspath(log_f.name) if log_f else None,
+            'error': None,
+        }, flush_progress=True)
+        if job is not None:
+            logger.info("[FETCH-%s] Job finalized with status: %s", job_id, job['status'])
         else:
-            print(f"[FETCH-{job_id}] ERROR: Job {job_id} not found in fetch_jobs during finalization!")
+            logger.error("[FETCH-%s] Job not found in fetch_jobs during finalization!", job_id)
         
         if return_code == 0:
-            print(f"[FETCH-{job_id}] SUCCESS: Fetch completed successfully for profile {profile_id}")
+            logger.info("[FETCH-%s] SUCCESS: Fetch completed successfully for profile %s", job_id, profile_id)
         else:
-            print(f"[FETCH-{job_id}] ERROR: Fetch failed for profile {profile_id} with exit code {return_code}")
+            logger.error("[FETCH-%s] Fetch failed for profile %s with exit code %s", job_id, profile_id, return_code)
 
     except subprocess.TimeoutExpired:
-        print(f"[FETCH-{job_id}] TIMEOUT: Script execution timed out after 5 minutes")
-        if job_id in fetch_jobs:
-            fetch_jobs[job_id]['status'] = 'timeout'
-            fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-            fetch_jobs[job_id]['error'] = 'Script execution timed out after 5 minutes'
-        else:
-            print(f"[FETCH-{job_id}] ERROR: Job {job_id} not found in fetch_jobs during timeout handling")
+        logger.error("[FETCH-%s] TIMEOUT: Script execution timed out after 5 minutes", job_id)
+        job = _finish_job(job_id, {
+            'status': 'timeout',
+            'end_time': now_iso(),
+            'error': 'Script execution timed out after 5 minutes',
+        })
+        if job is None:
+            logger.error("[FETCH-%s] Job not found in fetch_jobs during timeout handling", job_id)
     except Exception as e:
-        print(f"[FETCH-{job_id}] EXCEPTION: {str(e)}")
-        print(f"[FETCH-{job_id}] Exception type: {type(e).__name__}")
-        import traceback
-        print(f"[FETCH-{job_id}] Traceback: {traceback.format_exc()}")
-        if job_id in fetch_jobs:
-            fetch_jobs[job_id]['status'] = 'error'
-            fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-            fetch_jobs[job_id]['error'] = str(e)
-        else:
-            print(f"[FETCH-{job_id}] ERROR: Job {job_id} not found in fetch_jobs during exception handling")
+        logger.exception("[FETCH-%s] EXCEPTION (%s): %s", job_id, type(e).__name__, e)
+        job = _finish_job(job_id, {'status': 'error', 'end_time': now_iso(), 'error': str(e)})
+        if job is None:
+            logger.error("[FETCH-%s] Job not found in fetch_jobs during exception handling", job_id)
     finally:
-        # Only clear proc handle if job is actually completed/failed
+        if log_f is not None:
+            log_f.close()
+        # Every exit path above has finalized the job: release the proc handle, wake
+        # any canceller waiting on it, and schedule cleanup so the frontend can still
+        # read the final status for a while
+        fetch_procs.pop(job_id, None)
+        with fetch_jobs_lock:
+            _release_job(profile_id, job_id)
+        done = fetch_done.get(job_id)
+        if done is not None:
+            done.set()
+        _schedule_expiry(job_id, time.monotonic() + JOB_EXPIRY_SECONDS)
+
+def _signal_fetch_proc(proc, kill=False):
+    """SIGTERM (or SIGKILL) the fetch process group, so fetch_all.py's children stop too"""
+    if os.name == 'posix':
         try:
-            if fetch_jobs.get(job_id, {}).get('status') in ['completed', 'failed', 'timeout', 'error', 'cancelled']:
-                fetch_procs.pop(job_id, None)
-                
-                # Schedule job cleanup after a delay to allow frontend to check final status
-                def cleanup_job():
-                    import time
-                    time.sleep(10)  # Wait 10 seconds before removing the job
-                    if job_id in fetch_jobs:
-                        print(f"[DEBUG] Cleaning up completed job {job_id} after delay")
-                        del fetch_jobs[job_id]
-                
-                threading.Thread(target=cleanup_job, daemon=True).start()
-        except Exception:
+            # start_new_session=True made the child a group leader: pgid == pid
+            os.killpg(proc.pid, signal.SIGKILL if kill else signal.SIGTERM)
+        except ProcessLookupError:
             pass
+    elif kill:
+        proc.kill()
+    else:
+        proc.terminate()
+
+def _stop_fetch_proc(job_id, proc, timeout=1):
+    """Stop a cancelled fetch's process: SIGTERM its group, SIGKILL if not finalized within timeout"""
+    _signal_fetch_proc(proc)
+    # The fetch thread sets the event once it has reaped the process and finalized the job
+    done = fetch_done.get(job_id)
+    if done is not None:
+        finished = done.wait(timeout)
+    else:
+        try:
+            proc.wait(timeout=timeout)
+            finished = True
+        except subprocess.TimeoutExpired:
+            finished = False
+    if not finished:
+        _signal_fetch_proc(proc, kill=True)
+        # Let the fetch thread finalize before the caller marks the job cancelled
+        if done is not None:
+            done.wait(timeout)
+
+def _request_cancel(job_id):
+    """Flag a job as cancelled for its fetch thread, whatever stage it is in (set before anything else)"""
+    cancel = fetch_cancel.get(job_id)
+    if cancel is not None:
+        cancel.set()
+
+def _cancel_queued_fetch(job_id):
+    """Cancel a job's pool future if it hasn't started, doing the cleanup its fetch thread would have"""
+    fut = fetch_futures.get(job_id)
+    if fut is None or not fut.cancel():
+        return False
+    done = fetch_done.get(job_id)
+    if done is not None:
+        done.set()
+    _schedule_expiry(job_id, time.monotonic() + JOB_EXPIRY_SECONDS)
+    return True
+
+# os.path.exists results for served files, trusted for EXISTS_CACHE_TTL seconds so a
+# burst of UI polls for the same CSV costs a single stat()
+EXISTS_CACHE_TTL = 1.0
+_EXISTS_CACHE_MAX = 1024
+_exists_cache: OrderedDict[str | os.PathLike, tuple[float, bool]] = OrderedDict()
+
+def _exists(path: str | os.PathLike) -> bool:
+    now = time.monotonic()
+    hit = _exists_cache.get(path)
+    if hit is not None and now - hit[0] < EXISTS_CACHE_TTL:
+        return hit[1]
+    found = os.path.exists(path)
+    try:
+        _exists_cache[path] = (now, found)
+        _exists_cache.move_to_end(path)
+        while len(_exists_cache) > _EXISTS_CACHE_MAX:
+            _exists_cache.popitem(last=False)
+    except KeyError:  # another request thread evicted concurrently
+        pass
+    return found
 
 # Static file serving (maintains existing behavior)
 @app.route('/')
@@ -563,20 +972,18 @@ def favicon():
 def static_files(filename):
     """Serve static files with proper MIME types"""
     try:
-        # Check if file exists before trying to serve it
-        if not os.path.exists(filename):
-            return "File not found", 404
-            
+        # send_from_directory rejects paths outside the app folder and answers
+        # conditional GETs (ETag/Last-Modified) with 304
         # Handle CSV files with proper MIME type
         if filename.endswith('.csv'):
-            return send_file(filename, mimetype='text/csv')
+            return send_from_directory('.', filename, mimetype='text/csv')
         # Handle JSON files
         elif filename.endswith('.json'):
-            return send_file(filename, mimetype='application/json')
+            return send_from_directory('.', filename, mimetype='application/json')
         # Handle other static files
         else:
             return send_from_directory('.', filename)
-    except FileNotFoundError:
+    except (NotFound, FileNotFoundError):
         return "File not found", 404
     except Exception as e:
         return f"Error serving file: {str(e)}", 500
@@ -585,8 +992,8 @@ def static_files(filename):
 @app.route('/profiles/<profile_id>/csv/<filename>')
 def serve_profile_csv(profile_id, filename):
     """Serve CSV files from profile directories"""
-    file_path = f'profiles/{profile_id}/csv/{filename}'
-    if os.path.exists(file_path):
+    file_path = PROFILES_DIR / profile_id / 'csv' / filename
+    if _exists(file_path):
         return send_file(file_path, mimetype='text/csv')
     return "File not found", 404
 
@@ -605,18 +1012,17 @@ def create_profile():
             return jsonify({'error': 'All fields are required'}), 400
         
         # Validate profile name (alphanumeric, hyphens, underscores only)
-        import re
-        if not re.match(r'^[a-zA-Z0-9_-]+$', profile_name):
+        if not _PROFILE_NAME_RE.match(profile_name):
             return jsonify({'error': 'Profile name can only contain letters, numbers, hyphens, and underscores'}), 400
         
         # Check if profile already exists
-        profile_dir = f'profiles/{profile_name}'
-        if os.path.exists(profile_dir):
+        profile_dir = PROFILES_DIR / profile_name
+        if profile_dir.exists():
             return jsonify({'error': f'Profile "{profile_name}" already exists'}), 400
         
         # Create profile directory structure
-        os.makedirs(f'{profile_dir}/auth', exist_ok=True)
-        os.makedirs(f'{profile_dir}/csv', exist_ok=True)
+        (profile_dir / 'auth').mkdir(parents=True, exist_ok=True)
+        (profile_dir / 'csv').mkdir(parents=True, exist_ok=True)
         
         # Save client credentials with creation timestamp
         client_creds = {
@@ -625,12 +1031,10 @@ def create_profile():
             'created_at': datetime.now().isoformat()
         }
         
-        with open(f'{profile_dir}/auth/client.json', 'w') as f:
-            json.dump(client_creds, f, indent=2)
+        _write_json(profile_dir / 'auth' / 'client.json', client_creds, indent=True)
         
         # Create empty tokens file
-        with open(f'{profile_dir}/auth/tokens.json', 'w') as f:
-            json.dump({}, f)
+        _write_json(profile_dir / 'auth' / 'tokens.json', {})
         
         print(f"Created profile: {profile_name}")
         return jsonify({'message': f'Profile "{profile_name}" created successfully', 'profileName': profile_name})
@@ -650,73 +1054,56 @@ def delete_profile():
             return jsonify({'error': 'Profile name is required'}), 400
         
         # Validate profile name (alphanumeric, hyphens, underscores only)
-        import re
-        if not re.match(r'^[a-zA-Z0-9_-]+$', profile_name):
+        if not _PROFILE_NAME_RE.match(profile_name):
             return jsonify({'error': 'Invalid profile name format'}), 400
         
         # Check if profile exists
-        profile_dir = f'profiles/{profile_name}'
-        if not os.path.exists(profile_dir):
+        if not (PROFILES_DIR / profile_name).is_dir():
             return jsonify({'error': f'Profile "{profile_name}" not found'}), 404
         
         # Cancel any running or queued fetch jobs for this profile to avoid recreation during deletion
         try:
-            to_cancel = []
-            for jid, job in list(fetch_jobs.items()):
-                if job.get('profile') == profile_name and job.get('status') in ('queued', 'running'):
-                    to_cancel.append(jid)
+            with fetch_jobs_lock:
+                to_cancel = list(profile_active_jobs.get(profile_name, ()))
             for jid in to_cancel:
+                _request_cancel(jid)
+                _cancel_queued_fetch(jid)
                 proc = fetch_procs.get(jid)
                 if proc and proc.poll() is None:
                     try:
-                        proc.terminate()
-                        # Give it a moment to exit
-                        try:
-                            proc.wait(timeout=5)
-                        except Exception:
-                            proc.kill()
+                        _stop_fetch_proc(jid, proc)
                     except Exception as e:
                         print(f"Warning: failed to terminate fetch job {jid} for profile {profile_name}: {e}")
                 # Mark job as cancelled
-                try:
-                    fetch_jobs[jid]['status'] = 'cancelled'
-                    fetch_jobs[jid]['end_time'] = datetime.now().isoformat()
-                    fetch_jobs[jid]['error'] = 'Cancelled due to profile deletion'
-                except Exception:
-                    pass
+                with fetch_jobs_lock:
+                    job = fetch_jobs.get(jid)
+                    if job is not None:
+                        job.update({
+                            'status': 'cancelled',
+                            'end_time': now_iso(),
+                            'error': 'Cancelled due to profile deletion',
+                        })
+                    _release_job(profile_name, jid)
         except Exception as e:
             print(f"Warning: error while cancelling fetch jobs for {profile_name}: {e}")
         
-        # Run the reset script with --profile parameter in non-interactive mode
-        import subprocess
-        result = subprocess.run(
-            ['python', 'reset.py', '--profile', profile_name, '--yes'],
-            cwd=os.getcwd(),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=30
-        )
+        # Delete in-process with reset.py's non-interactive helper; one deletion at a time.
+        # reset.py defaults to its own folder, so point it at the PROFILES_DIR this server uses
+        with profile_delete_lock:
+            ok, msg = reset.delete_profile(profile_name, base_dir=str(PROFILES_DIR.resolve().parent))
         
-        if result.returncode == 0:
+        if ok:
             print(f"Successfully deleted profile: {profile_name}")
             # After deletion, try to sync profiles/index.json
             try:
-                import sys
-                sys.path.append('auth')
-                from authorize_fitbit import sync_existing_profiles  # type: ignore
                 sync_existing_profiles()
             except Exception as e:
                 print(f"Warning: could not sync profiles/index.json after delete: {e}")
             return jsonify({'message': f'Profile "{profile_name}" deleted successfully'})
         else:
-            error_msg = result.stderr or result.stdout or 'Unknown error'
-            print(f"Failed to delete profile {profile_name}: {error_msg}")
-            return jsonify({'error': f'Failed to delete profile: {error_msg}'}), 500
+            print(f"Failed to delete profile {profile_name}: {msg}")
+            return jsonify({'error': f'Failed to delete profile: {msg}'}), 500
         
-    except subprocess.TimeoutExpired:
-        return jsonify({'error': 'Profile deletion timed out'}), 500
     except Exception as e:
         print(f"Error deleting profile: {e}")
         return jsonify({'error': f'Failed to delete profile: {str(e)}'}), 500
@@ -729,66 +1116,50 @@ def fetch_data():
     data = request.get_json() or {}
     profile_id = data.get('profile', None)
     
-    # Create new job
-    job_counter += 1
-    job_id = str(job_counter)
-    
-    print(f"[DEBUG] Creating job {job_id} for profile {profile_id}")
-    print(f"[DEBUG] Current fetch_jobs keys: {list(fetch_jobs.keys())}")
-    
-    # Check if job already exists (shouldn't happen, but just in case)
-    if job_id in fetch_jobs:
-        print(f"[DEBUG] WARNING: Job {job_id} already exists! Overwriting...")
-    
-    fetch_jobs[job_id] = {
-        'id': job_id,
-        'profile': profile_id,
-        'status': 'queued',
-        'created_time': datetime.now().isoformat(),
-        'start_time': None,
-        'end_time': None,
-        'return_code': None,
-        'output': None,
-        'error': None
-    }
-    
-    print(f"[DEBUG] Job {job_id} created successfully")
-    print(f"[DEBUG] Updated fetch_jobs keys: {list(fetch_jobs.keys())}")
-    
-    # Add periodic job existence check
-    def check_job_exists():
+    with fetch_jobs_lock:
+        # A fetch already queued or running for this profile is reused rather than
+        # starting a second worker thread and fetch process for the same data
+        for jid in profile_active_jobs.get(profile_id, ()):
+            job = fetch_jobs.get(jid)
+            if job is not None and job.get('status') in ('queued', 'running'):
+                logger.debug("Reusing in-flight job %s for profile %s", job['id'], profile_id)
+                return jsonify({
+                    'job_id': job['id'],
+                    'status': job['status'],
+                    'message': 'Fetch operation already in progress'
+                })
+        
+        # Create new job
+        job_counter += 1
+        job_id = str(job_counter)
+        
+        logger.debug("Creating job %s for profile %s", job_id, profile_id)
+        logger.debug("Current fetch_jobs keys: %s", _JOB_KEYS)
+        
+        # Check if job already exists (shouldn't happen, but just in case)
         if job_id in fetch_jobs:
-            print(f"[DEBUG] Job {job_id} still exists in fetch_jobs")
-        else:
-            print(f"[DEBUG] WARNING: Job {job_id} missing from fetch_jobs!")
-            print(f"[DEBUG] Current fetch_jobs keys: {list(fetch_jobs.keys())}")
-    
-    # Check job existence after a short delay
-    import threading
-    def delayed_check():
-        import time
-        time.sleep(2)
-        check_job_exists()
-    
-    # Add periodic monitoring to track when job disappears
-    def monitor_job():
-        import time
-        for i in range(30):  # Monitor for 30 seconds
-            time.sleep(1)
-            if job_id not in fetch_jobs:
-                print(f"[DEBUG] MONITOR: Job {job_id} disappeared after {i+1} seconds!")
-                print(f"[DEBUG] MONITOR: Current fetch_jobs keys: {list(fetch_jobs.keys())}")
-                break
-            else:
-                print(f"[DEBUG] MONITOR: Job {job_id} still exists after {i+1} seconds")
+            logger.debug("WARNING: Job %s already exists! Overwriting...", job_id)
+        
+        fetch_done[job_id] = threading.Event()
+        fetch_cancel[job_id] = threading.Event()
+        profile_active_jobs[profile_id].add(job_id)
+        _add_job(fetch_jobs, job_id, _Job({
+            'id': job_id,
+            'profile': profile_id,
+            'status': 'queued',
+            'created_time': datetime.now().isoformat(),
+            'start_time': None,
+            'end_time': None,
+            'return_code': None,
+            'output': None,
+            'error': None
+        }))
     
-    threading.Thread(target=delayed_check, daemon=True).start()
-    threading.Thread(target=monitor_job, daemon=True).start()
+    logger.debug("Job %s created successfully", job_id)
+    logger.debug("Updated fetch_jobs keys: %s", _JOB_KEYS)
     
-    # Start background thread
-    thread = threading.Thread(target=run_fetch_script, args=(profile_id, job_id))
-    thread.daemon = False  # Changed from True to False to prevent premature cleanup
-    thread.start()
+    # Run on the fetch pool; the job stays 'queued' until a worker picks it up
+    fetch_futures[job_id] = fetch_pool.submit(run_fetch_script, profile_id, job_id)
     
     return jsonify({
         'job_id': job_id,
@@ -799,67 +1170,100 @@ def fetch_data():
 @app.route('/api/fetch-status/<job_id>')
 def fetch_status(job_id):
     """Get status of a fetch operation"""
-    # Check if fetch_jobs has been reassigned
-    check_fetch_jobs_reassignment()
+    logger.debug("Fetch status requested for job %s", job_id)
+    logger.debug("Current fetch_jobs keys: %s", _JOB_KEYS)
+    logger.debug("Job %s in fetch_jobs: %s", job_id, job_id in fetch_jobs)
     
-    print(f"[DEBUG] Fetch status requested for job {job_id}")
-    print(f"[DEBUG] Current fetch_jobs keys: {list(fetch_jobs.keys())}")
-    print(f"[DEBUG] Job {job_id} in fetch_jobs: {job_id in fetch_jobs}")
-    
-    if job_id not in fetch_jobs:
-        print(f"[DEBUG] Job {job_id} not found in fetch_jobs. Available jobs: {list(fetch_jobs.keys())}")
+    # Copy the job and its version together, so the body always matches its ETag
+    with fetch_jobs_lock:
+        job = fetch_jobs.get(job_id)
+        if job is not None:
+            version = getattr(job, 'version', 0)
+            job = dict(job)
+    if job is None:
+        logger.debug("Job %s not found in fetch_jobs. Available jobs: %s", job_id, _JOB_KEYS)
         # Check if there are any jobs at all
         if not fetch_jobs:
-            print(f"[DEBUG] fetch_jobs is completely empty!")
+            logger.debug("fetch_jobs is completely empty!")
         return jsonify({'error': 'Job not found'}), 404
     
-    job = fetch_jobs[job_id]
-    print(f"[DEBUG] Job {job_id} status: {job.get('status', 'unknown')}, throttle_active: {job.get('throttle_active', False)}")
-    return jsonify(job)
+    logger.debug("Job %s status: %s, throttle_active: %s", job_id, job.get('status', 'unknown'), job.get('throttle_active', False))
+    # Pollers resend the last ETag; an unchanged job answers 304 without being re-encoded
+    etag = f"{os.getpid()}-{job_id}-{version}"
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(job)
+    resp.set_etag(etag, weak=True)
+    return resp
+
+@app.route('/api/fetch-log/<job_id>')
+def fetch_log(job_id):
+    """Serve the full output log of a finished fetch operation, also after the job has expired"""
+    path = fetch_log_paths.get(job_id)
+    if path is None or not os.path.isfile(path):  # unknown job, or log pruned since
+        return jsonify({'error': 'Log not found'}), 404
+    return send_file(path, mimetype='text/plain')
 
 @app.route('/api/fetch-jobs')
 def list_fetch_jobs():
     """List all fetch jobs"""
-    return jsonify(list(fetch_jobs.values()))
+    with fetch_jobs_lock:
+        job_ids = list(fetch_jobs)
+
+    def generate():
+        # One job encoded at a time; jobs reaped since the snapshot are skipped
+        sep = b'['
+        for job_id in job_ids:
+            job = fetch_jobs.get(job_id)
+            if job is not None:
+                yield sep + app.json.dumps(dict(job)).encode('utf-8')
+                sep = b','
+        yield b'[]\n' if sep == b'[' else b']\n'
+
+    return Response(generate(), mimetype='application/json')
 
 @app.route('/api/cancel-fetch/<job_id>', methods=['POST'])
 def cancel_fetch(job_id):
     """Cancel a running fetch operation"""
-    print(f"[DEBUG] Cancel request for job {job_id}")
-    print(f"[DEBUG] Current fetch_jobs keys: {list(fetch_jobs.keys())}")
+    logger.debug("Cancel request for job %s", job_id)
+    logger.debug("Current fetch_jobs keys: %s", _JOB_KEYS)
     
-    if job_id not in fetch_jobs:
-        print(f"[DEBUG] Job {job_id} not found for cancellation")
+    with fetch_jobs_lock:
+        job = fetch_jobs.get(job_id)
+        status = job.get('status', 'unknown') if job is not None else None
+    if job is None:
+        logger.debug("Job %s not found for cancellation", job_id)
         return jsonify({'error': 'Job not found'}), 404
     
-    job = fetch_jobs[job_id]
-    print(f"[DEBUG] Job {job_id} status: {job.get('status', 'unknown')}")
+    logger.debug("Job %s status: %s", job_id, status)
     
-    if job['status'] not in ('queued', 'running'):
-        print(f"[DEBUG] Job {job_id} cannot be cancelled (status: {job['status']})")
+    if status not in ('queued', 'running'):
+        logger.debug("Job %s cannot be cancelled (status: %s)", job_id, status)
         return jsonify({'error': 'Job cannot be cancelled'}), 400
     
     try:
-        # Terminate the subprocess if it exists
+        # A job still waiting for a pool worker never starts; otherwise stop its subprocess
+        _request_cancel(job_id)
+        _cancel_queued_fetch(job_id)
         proc = fetch_procs.get(job_id)
         if proc and proc.poll() is None:
             try:
-                proc.terminate()
-                # Give it a moment to exit gracefully
-                try:
-                    proc.wait(timeout=5)
-                except Exception:
-                    proc.kill()
+                _stop_fetch_proc(job_id, proc)
             except Exception as e:
                 print(f"Warning: failed to terminate fetch job {job_id}: {e}")
         
         # Mark job as cancelled
-        fetch_jobs[job_id]['status'] = 'cancelled'
-        fetch_jobs[job_id]['end_time'] = datetime.now().isoformat()
-        fetch_jobs[job_id]['error'] = 'Cancelled by user'
+        with fetch_jobs_lock:
+            job.update({
+                'status': 'cancelled',
+                'end_time': now_iso(),
+                'error': 'Cancelled by user',
+            })
+            _release_job(job.get('profile'), job_id)
         
-        print(f"[DEBUG] Job {job_id} marked as cancelled")
-        print(f"[DEBUG] Updated fetch_jobs keys: {list(fetch_jobs.keys())}")
+        logger.debug("Job %s marked as cancelled", job_id)
+        logger.debug("Updated fetch_jobs keys: %s", _JOB_KEYS)
         
         return jsonify({
             'success': True,
@@ -884,6 +1288,7 @@ def fetch_logging():
         data = request.get_json() or {}
         enabled = data.get('enabled', True)
         VERBOSE_FETCH_LOGGING = bool(enabled)
+        _apply_log_level()
         
         return jsonify({
             'success': True,
@@ -891,88 +1296,204 @@ def fetch_logging():
             'message': 'Verbose fetch logging ' + ('enabled' if VERBOSE_FETCH_LOGGING else 'disabled')
         })
 
+# Last /api/profiles response body (encoded JSON) and the directory mtimes it was built from
+_profiles_cache: tuple = (None, b'')
+
+def _profiles_key(profiles_dir):
+    """mtimes of profiles/ and each profile's auth/ folder, which change whenever a
+    profile is added or removed or its tokens.json/client.json is created or replaced"""
+    auth_mtimes = []
+    with os.scandir(profiles_dir) as it:
+        for entry in it:
+            try:
+                auth_mtimes.append((entry.name, os.stat(os.path.join(entry.path, 'auth')).st_mtime_ns))
+            except OSError:
+                pass
+    return os.stat(profiles_dir).st_mtime_ns, frozenset(auth_mtimes)
+
 @app.route('/api/profiles')
 def list_profiles():
     """List available profiles with creation dates"""
+    global _profiles_cache
     profiles = []
-    profiles_dir = 'profiles'
+    profiles_dir = PROFILES_DIR
     
-    if os.path.exists(profiles_dir):
-        for entry in os.listdir(profiles_dir):
-            profile_path = os.path.join(profiles_dir, entry)
-            if os.path.isdir(profile_path) and os.path.exists(os.path.join(profile_path, 'auth', 'tokens.json')):
+    try:
+        key = _profiles_key(profiles_dir)
+    except OSError:
+        key = None
+    if key is not None and key == _profiles_cache[0]:
+        return Response(_profiles_cache[1], mimetype='application/json')
+    
+    if key is not None:
+        # DirEntry.is_dir() uses the d_type from the directory read, so no per-entry stat
+        with os.scandir(profiles_dir) as it:
+            for entry in it:
+                if not entry.is_dir() or not os.path.exists(os.path.join(entry.path, 'auth', 'tokens.json')):
+                    continue
                 # Try to get creation date from client.json
-                client_file = os.path.join(profile_path, 'auth', 'client.json')
                 creation_date = 'Unknown'
-                
-                if os.path.exists(client_file):
-                    try:
-                        with open(client_file, 'r') as f:
-                            client_data = json.load(f)
-                            if 'created_at' in client_data:
-                                # Parse ISO format and format for display
-                                created_dt = datetime.fromisoformat(client_data['created_at'])
-                                creation_date = created_dt.strftime('%Y-%m-%d %H:%M')
-                    except Exception as e:
-                        print(f"Error reading creation date for {entry}: {e}")
+                try:
+                    client_data = _read_json(os.path.join(entry.path, 'auth', 'client.json'))
+                    if 'created_at' in client_data:
+                        # Parse ISO format and format for display
+                        created_dt = datetime.fromisoformat(client_data['created_at'])
+                        creation_date = created_dt.strftime('%Y-%m-%d %H:%M')
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    print(f"Error reading creation date for {entry.name}: {e}")
                 
                 profiles.append({
-                    'name': entry,
+                    'name': entry.name,
                     'created': creation_date
                 })
     
     # Sort by profile name
     profiles.sort(key=lambda x: x['name'])
-    return jsonify(profiles)
+    # Encode once; cache hits reuse the bytes (werkzeug sets Content-Length from them)
+    payload = jsonify(profiles).get_data()
+    _profiles_cache = (key, payload)
+    return Response(payload, mimetype='application/json')
+
+_HEALTH_TEMPLATE = b'{"active_jobs":%d,"status":"healthy","timestamp":"%s"}\n'
 
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'active_jobs': len([j for j in fetch_jobs.values() if j['status'] == 'running'])
-    })
+    # Fixed-shape body: only the job count and timestamp are spliced in (same bytes jsonify would give)
+    body = _HEALTH_TEMPLATE % (len(running_jobs), now_iso().encode('ascii'))
+    return Response(body, mimetype='application/json')
+
+# Lines of authorize_fitbit.py stdout/stderr kept for the job (each stream separately)
+AUTH_OUTPUT_TAIL_LINES = 500
+
+def _run_with_output_tail(cmd, timeout, max_lines=AUTH_OUTPUT_TAIL_LINES):
+    """Run cmd, keeping only the last max_lines of stdout and of stderr.
+
+    Both pipes are multiplexed with selectors and drained with os.read, so memory stays
+    bounded however long the child runs. Windows can't select on pipes, so there the
+    output is collected with communicate() and trimmed afterwards.
+    Returns (return_code, stdout_tail, stderr_tail); raises TimeoutExpired after killing the child.
+    """
+    proc = subprocess.Popen(cmd, cwd=os.getcwd(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    if os.name != 'posix':
+        try:
+            out, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+        return (proc.returncode,
+                '\n'.join(out.decode('utf-8', 'replace').splitlines()[-max_lines:]),
+                '\n'.join(err.decode('utf-8', 'replace').splitlines()[-max_lines:]))
+
+    deadline = time.monotonic() + timeout
+    tails = {}
+    with selectors.DefaultSelector() as sel:
+        for stream in (proc.stdout, proc.stderr):
+            os.set_blocking(stream.fileno(), False)
+            sel.register(stream, selectors.EVENT_READ,
+                         [codecs.getincrementaldecoder('utf-8')(errors='replace'), ''])
+            tails[stream] = deque(maxlen=max_lines)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                proc.kill()
+                proc.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            for key, _ in sel.select(timeout=min(1.0, remaining)):
+                decoder, pending = key.data
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    pending = (pending + decoder.decode(chunk)).replace('\r\n', '\n')
+                else:
+                    sel.unregister(key.fileobj)
+                    pending += decoder.decode(b'', final=True)
+                *lines, key.data[1] = pending.split('\n')
+                tails[key.fileobj].extend(lines)
+                if not chunk and key.data[1]:
+                    tails[key.fileobj].append(key.data[1])
+    return proc.wait(), '\n'.join(tails[proc.stdout]), '\n'.join(tails[proc.stderr])
 
 def run_authorize_script(profile_id, job_id):
     """Run authorize_fitbit.py in background thread to complete OAuth flow"""
     try:
-        auth_jobs[job_id]['status'] = 'running'
-        auth_jobs[job_id]['start_time'] = datetime.now().isoformat()
+        job = auth_jobs[job_id]
+        job.update({'status': 'running', 'start_time': now_iso()})
 
         # Ensure profile directory exists (created during create-profile)
-        profile_dir = f'profiles/{profile_id}'
-        if not os.path.exists(profile_dir):
-            auth_jobs[job_id]['status'] = 'failed'
-            auth_jobs[job_id]['end_time'] = datetime.now().isoformat()
-            auth_jobs[job_id]['error'] = f'Profile {profile_id} not found. Create it first.'
+        if not (PROFILES_DIR / profile_id).is_dir():
+            job.update({
+                'status': 'failed',
+                'end_time': now_iso(),
+                'error': f'Profile {profile_id} not found. Create it first.',
+            })
             return
 
         # Run the authorization script (opens browser locally and saves tokens)
         cmd = ['python', 'auth/authorize_fitbit.py', '--profile', profile_id]
-        result = subprocess.run(
-            cmd,
-            cwd=os.getcwd(),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=900  # 15 minutes to allow user interaction
-        )
+        return_code, out, err = _run_with_output_tail(cmd, timeout=900)  # 15 minutes to allow user interaction
 
-        auth_jobs[job_id]['status'] = 'completed' if result.returncode == 0 else 'failed'
-        auth_jobs[job_id]['end_time'] = datetime.now().isoformat()
-        auth_jobs[job_id]['return_code'] = result.returncode
-        auth_jobs[job_id]['output'] = result.stdout
-        auth_jobs[job_id]['error'] = result.stderr
+        job.update({
+            'status': 'completed' if return_code == 0 else 'failed',
+            'end_time': now_iso(),
+            'return_code': return_code,
+            'output': out,
+            'error': err,
+        })
     except subprocess.TimeoutExpired:
-        auth_jobs[job_id]['status'] = 'timeout'
-        auth_jobs[job_id]['end_time'] = datetime.now().isoformat()
-        auth_jobs[job_id]['error'] = 'Authorization timed out after 15 minutes'
+        auth_jobs[job_id].update({
+            'status': 'timeout',
+            'end_time': now_iso(),
+            'error': 'Authorization timed out after 15 minutes',
+        })
     except Exception as e:
-        auth_jobs[job_id]['status'] = 'error'
-        auth_jobs[job_id]['end_time'] = datetime.now().isoformat()
-        auth_jobs[job_id]['error'] = str(e)
+        auth_jobs[job_id].update({'status': 'error', 'end_time': now_iso(), 'error': str(e)})
+    finally:
+        _schedule_expiry(job_id, time.monotonic() + AUTH_JOB_EXPIRY_SECONDS, table='auth')
+
+# Redirect URI / HTTPS cert state from the environment, re-read at most every REDIRECT_SETTINGS_TTL seconds
+REDIRECT_SETTINGS_TTL = 60.0
+_redirect_settings_cache: tuple = (0.0, None)
+
+def _redirect_settings():
+    """(redirect_uri, needs_https_local, has_https_creds), cached for REDIRECT_SETTINGS_TTL"""
+    global _redirect_settings_cache
+    now = time.monotonic()
+    checked_at, settings = _redirect_settings_cache
+    if settings is not None and now - checked_at < REDIRECT_SETTINGS_TTL:
+        return settings
+    redirect_uri = os.getenv('FITBIT_REDIRECT_URI', DEFAULT_REDIRECT_URI).strip()
+    needs_https_local = redirect_uri.startswith('https://localhost:') or redirect_uri.startswith('https://127.0.0.1:')
+    cert = os.getenv('FITBIT_SSL_CERT', '').strip()
+    key = os.getenv('FITBIT_SSL_KEY', '').strip()
+    has_https_creds = bool(cert and key and os.path.exists(cert) and os.path.exists(key))
+    settings = (redirect_uri, needs_https_local, has_https_creds)
+    _redirect_settings_cache = (now, settings)
+    return settings
+
+# Authorization URL per profile: (client.json mtime_ns, redirect_uri, auth_url)
+_auth_url_cache: dict[str, tuple[int, str, str]] = {}
+
+def _auth_url_for(profile_id, client_file, mtime, redirect_uri):
+    """Fitbit authorization URL for a profile, rebuilt only when client.json or the redirect URI changes;
+    None if client.json has no client_id"""
+    cached = _auth_url_cache.get(profile_id)
+    if cached is not None and cached[0] == mtime and cached[1] == redirect_uri:
+        return cached[2]
+    client_id = _read_json(client_file).get('client_id', '').strip()
+    if not client_id:
+        return None
+    params = {
+        'client_id': client_id,
+        'response_type': 'code',
+        'scope': 'heartrate sleep activity profile',
+        'redirect_uri': redirect_uri,
+    }
+    auth_url = f"https://www.fitbit.com/oauth2/authorize?{urlencode(params)}"
+    _auth_url_cache[profile_id] = (mtime, redirect_uri, auth_url)
+    return auth_url
 
 @app.route('/api/authorize/<profile_id>', methods=['GET', 'POST'])
 def start_authorization(profile_id):
@@ -982,38 +1503,19 @@ def start_authorization(profile_id):
     POST: Start background authorization job that opens a browser and captures the callback automatically.
     """
     try:
-        import sys
-        sys.path.append('auth')
-        from authorize_fitbit import REDIRECT_URI as DEFAULT_REDIRECT_URI  # type: ignore
-        from authorize_fitbit import exchange_code_for_token  # noqa: F401 (used by other endpoint)
-
         # Determine redirect URI and whether HTTPS localhost is usable
-        redirect_uri = os.getenv('FITBIT_REDIRECT_URI', DEFAULT_REDIRECT_URI).strip()
-        needs_https_local = redirect_uri.startswith('https://localhost:') or redirect_uri.startswith('https://127.0.0.1:')
-        cert = os.getenv('FITBIT_SSL_CERT', '').strip()
-        key = os.getenv('FITBIT_SSL_KEY', '').strip()
-        has_https_creds = bool(cert and key and os.path.exists(cert) and os.path.exists(key))
+        redirect_uri, needs_https_local, has_https_creds = _redirect_settings()
 
         # Load client_id for auth URL
-        client_file = os.path.join('profiles', profile_id, 'auth', 'client.json')
-        if not os.path.exists(client_file):
+        client_file = PROFILES_DIR / profile_id / 'auth' / 'client.json'
+        try:
+            mtime = os.stat(client_file).st_mtime_ns
+        except FileNotFoundError:
             return jsonify({'error': f'Client credentials not found for profile {profile_id}'}), 400
-        with open(client_file, 'r', encoding='utf-8') as f:
-            client_json = json.load(f)
-        client_id = client_json.get('client_id', '').strip()
-        if not client_id:
+        auth_url = _auth_url_for(profile_id, client_file, mtime, redirect_uri)
+        if auth_url is None:
             return jsonify({'error': 'Client ID missing in client.json'}), 400
 
-        # Build authorization URL
-        from urllib.parse import urlencode
-        params = {
-            'client_id': client_id,
-            'response_type': 'code',
-            'scope': 'heartrate sleep activity profile',
-            'redirect_uri': redirect_uri,
-        }
-        auth_url = f"https://www.fitbit.com/oauth2/authorize?{urlencode(params)}"
-
         if request.method == 'GET':
             if needs_https_local and not has_https_creds:
                 return jsonify({
@@ -1031,24 +1533,22 @@ def start_authorization(profile_id):
 
         # POST: start background job
         global auth_job_counter
-        auth_job_counter += 1
-        job_id = str(auth_job_counter)
-
-        auth_jobs[job_id] = {
-            'id': job_id,
-            'profile': profile_id,
-            'status': 'queued',
-            'created_time': datetime.now().isoformat(),
-            'start_time': None,
-            'end_time': None,
-            'return_code': None,
-            'output': None,
-            'error': None
-        }
+        with auth_jobs_lock:
+            auth_job_counter += 1
+            job_id = str(auth_job_counter)
+            _add_job(auth_jobs, job_id, {
+                'id': job_id,
+                'profile': profile_id,
+                'status': 'queued',
+                'created_time': datetime.now().isoformat(),
+                'start_time': None,
+                'end_time': None,
+                'return_code': None,
+                'output': None,
+                'error': None
+            })
 
-        thread = threading.Thread(target=run_authorize_script, args=(profile_id, job_id))
-        thread.daemon = False  # Changed from True to False to prevent premature cleanup
-        thread.start()
+        auth_pool.submit(run_authorize_script, profile_id, job_id)
 
         return jsonify({
             'job_id': job_id,
@@ -1061,9 +1561,10 @@ def start_authorization(profile_id):
 @app.route('/api/authorize-status/<job_id>')
 def authorize_status(job_id):
     """Get status of an authorization operation"""
-    if job_id not in auth_jobs:
+    job = auth_jobs.get(job_id)
+    if job is None:
         return jsonify({'error': 'Job not found'}), 404
-    return jsonify(auth_jobs[job_id])
+    return jsonify(job)
 
 @app.route('/api/authorize-exchange', methods=['POST'])
 def authorize_exchange():
@@ -1077,16 +1578,6 @@ def authorize_exchange():
         if not profile_name:
             return jsonify({'error': 'Profile name is required'}), 400
 
-        import sys
-        sys.path.append('auth')
-        from authorize_fitbit import (
-            extract_code_from_url,
-            exchange_code_for_token,
-            client_credentials_file_for,
-            get_active_profile,
-            REDIRECT_URI as DEFAULT_REDIRECT_URI,
-        )
-
         # Determine code
         code = pasted_code
         if not code:
@@ -1096,11 +1587,10 @@ def authorize_exchange():
             return jsonify({'error': 'Authorization code not found. Paste the full redirected URL or the code.'}), 400
 
         # Load client credentials
-        cred_path = os.path.join('profiles', profile_name, 'auth', 'client.json')
-        if not os.path.exists(cred_path):
+        cred_path = PROFILES_DIR / profile_name / 'auth' / 'client.json'
+        if not cred_path.exists():
             return jsonify({'error': 'Client credentials file not found for this profile'}), 400
-        with open(cred_path, 'r', encoding='utf-8') as f:
-            cj = json.load(f)
+        cj = _read_json(cred_path)
         client_id = (cj.get('client_id') or '').strip()
         client_secret = (cj.get('client_secret') or '').strip()
         if not client_id or not client_secret:
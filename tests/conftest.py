@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import common.* from the repo root and the chart helpers from generate/ (not a package)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "generate"))
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from common.csv_cache import load_csv_cached, parquet_sidecar_for
+
+
+def _write_csv(path):
+    path.write_text("date,dateOfSleep,steps\n2024-01-01,2024-01-01,100\n2024-01-02,,200\n")
+    return str(path)
+
+
+def test_variant_write_removes_stale_variants(tmp_path):
+    csv = _write_csv(tmp_path / "fitbit_sleep.csv")
+    stale = parquet_sidecar_for(csv, "0123abcd")
+    open(stale, "wb").close()
+    unrelated = str(tmp_path / "fitbit_sleep.notes.parquet")
+    open(unrelated, "wb").close()
+
+    load_csv_cached(csv)
+    load_csv_cached(csv, parse_dates=("date", "dateOfSleep"))
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(parquet_sidecar_for(csv))
+    assert os.path.exists(unrelated)
+    assert len(list(tmp_path.glob("fitbit_sleep.????????.parquet"))) == 1
+
+
+def test_round_trip_through_sidecar(tmp_path):
+    csv = _write_csv(tmp_path / "fitbit_steps.csv")
+    first = load_csv_cached(csv, parse_dates=("date", "dateOfSleep"))
+    assert str(first["date"].dtype) == "datetime64[ns]"
+    assert first["steps"].dtype == "float32"
+    assert pd.isna(first["dateOfSleep"].iloc[1])
+
+    assert len(list(tmp_path.glob("fitbit_steps.????????.parquet"))) == 1
+    second = load_csv_cached(csv, parse_dates=("date", "dateOfSleep"))
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_stale_sidecar_is_rewritten(tmp_path):
+    csv = _write_csv(tmp_path / "fitbit_steps.csv")
+    load_csv_cached(csv)
+    with open(csv, "a") as f:
+        f.write("2024-01-03,2024-01-03,300\n")
+    sidecar = parquet_sidecar_for(csv)
+    os.utime(csv, ns=(os.stat(sidecar).st_mtime_ns + 1_000_000,) * 2)
+    assert load_csv_cached(csv)["steps"].tolist() == [100.0, 200.0, 300.0]
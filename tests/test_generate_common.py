@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from _common import monthly_yearly_aggregates, plot_weekday_heatmap
+from hrv_graphs import HRV
+
+
+def test_weekday_heatmap_skips_nat_dates(tmp_path):
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-01", None, "2024-01-02", "2024-01-08"]),
+        "rmssd": [30.0, 40.0, np.nan, 34.0],
+    })
+    plot_weekday_heatmap(df, HRV, str(tmp_path))
+    assert (tmp_path / "hrv_weekday_heatmap.png").exists()
+
+
+def test_monthly_yearly_aggregates_skip_nat_dates():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2023-12-31", "2024-01-05", None, "2024-01-20", "2024-03-01"]),
+        "rmssd": [10.0, 20.0, 99.0, 40.0, 50.0],
+    })
+    monthly, yearly = monthly_yearly_aggregates(df, ["rmssd"])
+    assert monthly[["year", "month"]].values.tolist() == [[2023, 12], [2024, 1], [2024, 3]]
+    assert monthly["rmssd"].tolist() == [10.0, 30.0, 50.0]
+    assert monthly["month_year"].tolist() == ["12/23", "01/24", "03/24"]
+    assert monthly["time_index"].tolist() == [0, 1, 2]
+    assert yearly.set_index("year")["rmssd"].to_dict() == {2023: 10.0, 2024: pytest.approx(110.0 / 3)}
@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.stats import correlations, fit_trend
+
+
+def test_fit_trend_recovers_known_line():
+    x = np.arange(10)
+    slope, intercept = fit_trend(x, 2.0 * x + 1.0)
+    assert slope == pytest.approx(2.0)
+    assert intercept == pytest.approx(1.0)
+
+
+def test_fit_trend_ignores_nan_pairs():
+    slope, intercept = fit_trend([0, 1, 2, 3], [1.0, np.nan, 5.0, 7.0])
+    assert slope == pytest.approx(2.0)
+    assert intercept == pytest.approx(1.0)
+
+
+def test_spearman_averages_tied_ranks():
+    x = [1.0, 2.0, 2.0, 3.0, 5.0, 5.0]
+    y = [2.0, 1.0, 4.0, 3.0, 6.0, 5.0]
+    pearson, spearman = correlations(x, y)
+    # Average ranks: x -> 1, 2.5, 2.5, 4, 5.5, 5.5; y -> 2, 1, 4, 3, 6, 5
+    expected = np.corrcoef([1, 2.5, 2.5, 4, 5.5, 5.5], [2, 1, 4, 3, 6, 5])[0, 1]
+    assert spearman == pytest.approx(expected)
+    assert spearman == pytest.approx(pd.Series(x).corr(pd.Series(y), method="spearman"))
+    assert pearson == pytest.approx(np.corrcoef(x, y)[0, 1])
+
+
+def test_correlations_need_two_pairs():
+    pearson, spearman = correlations([1.0, np.nan], [2.0, 3.0])
+    assert math.isnan(pearson) and math.isnan(spearman)